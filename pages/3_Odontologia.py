@@ -1,113 +1,88 @@
 # -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import numpy as np
-import os
-import io
 from datetime import datetime
-import locale
 
-# Configurar locale para o padrão brasileiro
-try:
-    locale.setlocale(locale.LC_ALL, 'pt_BR.UTF-8')
-except:
-    try:
-        locale.setlocale(locale.LC_ALL, 'Portuguese_Brazil.1252')
-    except:
-        pass
-
-# Função para formatar valores monetários no padrão brasileiro
-def formatar_moeda(valor):
-    return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-
-# Função para formatar números inteiros com separador de milhar
-def formatar_numero(valor):
-    return f"{valor:,}".replace(',', '.')
-
-# Função para formatar percentuais
-def formatar_percentual(valor):
-    return f"{valor:.2f}%".replace('.', ',')
+from utils.cubo import kpis
+from utils.dados import (DIRETORIO_DADOS, PADRAO_PLANILHAS, agrupar_soma, carregar_catalogo, carregar_selecao,
+                         listar_planilhas, versao_dados)
+from utils.exportacao import FORMATOS_SUBAREA, botoes_download
+from utils.formatacao import formatar_moeda, formatar_numero
+from utils.graficos import figura_em_cache, montar_chave_graficos
+from utils.instrumentacao import anotar, finalizar_medicao, iniciar_medicao
+from utils.periodo import descrever_periodo, seletor_meses
 
 # -------------------------- CONFIGURAÇÃO DA PÁGINA --------------------------
 st.set_page_config(page_title="Dashboard - Odontologia", layout="wide")
 
-# -------------------------- FUNÇÃO PARA LER ARQUIVOS --------------------------
-def read_excel_file(file_path):
-    """
-    Lê arquivo Excel específico e retorna um DataFrame do pandas.
-    """
-    try:
-        df = pd.read_excel(file_path)
-        return df
-    except Exception as e:
-        st.error(f"Erro ao ler o arquivo: {e}")
-        return None
+# Tempos da execução, no modo de depuração (ver utils/instrumentacao.py)
+iniciar_medicao("Odontologia")
 
 # -------------------------- INTERFACE STREAMLIT --------------------------
+# Planilhas mensais disponíveis e meses que elas contêm
+planilhas = listar_planilhas()
+catalogo = carregar_catalogo(planilhas)
+
+# Meses exibidos (seleção na barra lateral)
+meses = seletor_meses(list(catalogo))
+
 st.title("🦷 Dashboard - Odontologia")
 st.markdown(
-    "Este dashboard apresenta os dados específicos da subárea Odontologia.")
+    f"Este dashboard apresenta os dados específicos da subárea Odontologia, em {descrever_periodo(meses)}.")
 
-# Caminho do arquivo Excel
-file_path = "Analise_Agosto.xlsx"
+# Subárea exibida nesta página
+subarea = "Odontologia"
 
-# Verifica se o arquivo existe
-if os.path.exists(file_path):
-    # Lê a planilha
-    df = read_excel_file(file_path)
+# Verifica se há meses selecionados
+if meses:
+    # Lê apenas as partições de Odontologia nos meses selecionados
+    selecao = carregar_selecao(planilhas, meses, subarea)
 
-    if df is not None and not df.empty:
-        # Filtra apenas dados de Odontologia
-        df = df[df['Subarea'] == 'Odontologia']
-        
-        # Adiciona coluna de receita
-        df['Receita'] = df['Quantidade'] * df['ValorUnitario']
-        
-        # Converte a coluna de data para o formato correto
-        df['dataRealizado'] = pd.to_datetime(df['dataRealizado'])
-        df['Dia'] = df['dataRealizado'].dt.day
+    if selecao is not None:
         
         # -------------------- FILTROS --------------------
         st.sidebar.header("🔍 Filtros")
         
         # Filtro de unidade
-        unidades = ["Todas"] + sorted(df['Unidade'].unique().tolist())
+        unidades = ["Todas"] + selecao.valores('Unidade')
         unidade_selecionada = st.sidebar.selectbox("Unidade", unidades)
         
         # Filtro de categoria
-        categorias = ["Todas"] + sorted(df['Categoria'].unique().tolist())
+        categorias = ["Todas"] + selecao.valores('Categoria')
         categoria_selecionada = st.sidebar.selectbox("Categoria", categorias)
         
         # Filtro de tipo de atendimento
-        tipos_atendimento = ["Todos"] + sorted(df['TipoAtendimento'].unique().tolist())
+        tipos_atendimento = ["Todos"] + selecao.valores('TipoAtendimento')
         tipo_atendimento_selecionado = st.sidebar.selectbox("Tipo de Atendimento", tipos_atendimento)
         
         # Filtro de tipo de serviço
-        tipos_servico = ["Todos"] + sorted(df['TipoServico'].unique().tolist())
+        tipos_servico = ["Todos"] + selecao.valores('TipoServico')
         tipo_servico_selecionado = st.sidebar.selectbox("Tipo de Serviço", tipos_servico)
         
         # Aplicar filtros
-        df_filtrado = df.copy()
-        
+        filtros = {}
         if unidade_selecionada != "Todas":
-            df_filtrado = df_filtrado[df_filtrado['Unidade'] == unidade_selecionada]
-            
+            filtros['Unidade'] = unidade_selecionada
         if categoria_selecionada != "Todas":
-            df_filtrado = df_filtrado[df_filtrado['Categoria'] == categoria_selecionada]
-            
+            filtros['Categoria'] = categoria_selecionada
         if tipo_atendimento_selecionado != "Todos":
-            df_filtrado = df_filtrado[df_filtrado['TipoAtendimento'] == tipo_atendimento_selecionado]
-            
+            filtros['TipoAtendimento'] = tipo_atendimento_selecionado
         if tipo_servico_selecionado != "Todos":
-            df_filtrado = df_filtrado[df_filtrado['TipoServico'] == tipo_servico_selecionado]
+            filtros['TipoServico'] = tipo_servico_selecionado
+        
+        # O cubo filtrado responde KPIs, gráficos e tabela; as linhas filtradas
+        # só são montadas ao gerar um download
+        cubo_filtrado = selecao.filtrar(filtros)
+        anotar(meses=meses, filtros=filtros)
+        
+        # Cada gráfico fica em cache por versão dos dados, página e filtros
+        # (ver utils/graficos.py); só é reconstruído na primeira vez
+        chave_graficos = montar_chave_graficos(versao_dados(planilhas, meses, subarea), subarea, filtros)
         
         # -------------------- CÁLCULO DE KPIs --------------------
         # KPIs gerais
-        qtd_total = df_filtrado['Quantidade'].sum()
-        rec_total = df_filtrado['Receita'].sum()
-        valor_medio = rec_total / qtd_total if qtd_total > 0 else 0
-        num_atendimentos = len(df_filtrado)
+        qtd_total, rec_total, valor_medio, num_atendimentos = kpis(cubo_filtrado)
         
         # -------------------- INDICADORES (KPIs) --------------------
         st.header("🔢 Indicadores (KPIs) de Odontologia")
@@ -119,172 +94,198 @@ if os.path.exists(file_path):
         col3.metric("Valor Médio", formatar_moeda(valor_medio))
         col4.metric("Número de Atendimentos", formatar_numero(num_atendimentos))
         
-        # -------------------- VISUALIZAÇÕES ESPECÍFICAS --------------------
-        st.header("📈 Visualizações de Odontologia")
+        # -------------------- SEÇÕES --------------------
+        # Só a seção escolhida é calculada e enviada ao navegador; com st.tabs,
+        # todas as abas seriam executadas a cada interação
+        secao = st.radio(
+            "Seção",
+            ["📈 Visualizações", "📋 Tabela Detalhada", "⬇️ Baixar Dados"],
+            horizontal=True,
+            label_visibility="collapsed"
+        )
         
-        # Layout de duas colunas para os gráficos
-        col1, col2 = st.columns(2)
+        if secao == "📈 Visualizações":
+            # -------------------- VISUALIZAÇÕES ESPECÍFICAS --------------------
+            st.header("📈 Visualizações de Odontologia")
         
-        # 1. Gráfico de barras: Quantidade por Unidade
-        with col1:
-            df_unidade = df_filtrado.groupby('Unidade')['Quantidade'].sum().reset_index().sort_values('Quantidade', ascending=False)
-            fig1 = px.bar(
-                df_unidade, 
-                x='Unidade', 
-                y='Quantidade', 
-                title="Quantidade por Unidade", 
-                color='Unidade'
-            )
-            fig1.update_layout(xaxis_title="Unidade", yaxis_title="Quantidade")
-            st.plotly_chart(fig1, use_container_width=True)
+            # Layout de duas colunas para os gráficos
+            col1, col2 = st.columns(2)
         
-        # 2. Gráfico de barras: Receita por Unidade
-        with col2:
-            df_unidade_receita = df_filtrado.groupby('Unidade')['Receita'].sum().reset_index().sort_values('Receita', ascending=False)
-            fig2 = px.bar(
-                df_unidade_receita, 
-                x='Unidade', 
-                y='Receita', 
-                title="Receita por Unidade", 
-                color='Unidade'
-            )
-            fig2.update_layout(xaxis_title="Unidade", yaxis_title="Receita (R$)")
-            st.plotly_chart(fig2, use_container_width=True)
+            # 1. Gráfico de barras: Quantidade por Unidade
+            with col1:
+                def _figura():
+                    df_unidade = agrupar_soma(cubo_filtrado, 'Unidade', 'Quantidade').sort_values('Quantidade', ascending=False)
+                    fig1 = px.bar(
+                        df_unidade, 
+                        x='Unidade', 
+                        y='Quantidade', 
+                        title="Quantidade por Unidade", 
+                        color='Unidade'
+                    )
+                    fig1.update_layout(xaxis_title="Unidade", yaxis_title="Quantidade")
+                    return fig1
+                fig1 = figura_em_cache(chave_graficos, 'fig1', _figura)
+                st.plotly_chart(fig1, use_container_width=True)
         
-        # 3. Gráfico de pizza: Distribuição por Categoria
-        with col1:
-            df_categoria = df_filtrado.groupby('Categoria')['Quantidade'].sum().reset_index()
-            fig3 = px.pie(
-                df_categoria, 
-                values='Quantidade', 
-                names='Categoria', 
-                title="Distribuição por Categoria"
-            )
-            st.plotly_chart(fig3, use_container_width=True)
+            # 2. Gráfico de barras: Receita por Unidade
+            with col2:
+                def _figura():
+                    df_unidade_receita = agrupar_soma(cubo_filtrado, 'Unidade', 'Receita').sort_values('Receita', ascending=False)
+                    fig2 = px.bar(
+                        df_unidade_receita, 
+                        x='Unidade', 
+                        y='Receita', 
+                        title="Receita por Unidade", 
+                        color='Unidade'
+                    )
+                    fig2.update_layout(xaxis_title="Unidade", yaxis_title="Receita (R$)")
+                    return fig2
+                fig2 = figura_em_cache(chave_graficos, 'fig2', _figura)
+                st.plotly_chart(fig2, use_container_width=True)
         
-        # 4. Gráfico de pizza: Distribuição por Tipo de Atendimento
-        with col2:
-            df_tipo_atendimento = df_filtrado.groupby('TipoAtendimento')['Quantidade'].sum().reset_index()
-            fig4 = px.pie(
-                df_tipo_atendimento, 
-                values='Quantidade', 
-                names='TipoAtendimento', 
-                title="Distribuição por Tipo de Atendimento"
-            )
-            st.plotly_chart(fig4, use_container_width=True)
+            # 3. Gráfico de pizza: Distribuição por Categoria
+            with col1:
+                def _figura():
+                    df_categoria = agrupar_soma(cubo_filtrado, 'Categoria', 'Quantidade')
+                    fig3 = px.pie(
+                        df_categoria, 
+                        values='Quantidade', 
+                        names='Categoria', 
+                        title="Distribuição por Categoria"
+                    )
+                    return fig3
+                fig3 = figura_em_cache(chave_graficos, 'fig3', _figura)
+                st.plotly_chart(fig3, use_container_width=True)
         
-        # 5. Gráfico de barras: Top 10 Serviços mais realizados
-        df_servicos = df_filtrado.groupby('NMServico')['Quantidade'].sum().reset_index().sort_values('Quantidade', ascending=False).head(10)
-        fig5 = px.bar(
-            df_servicos, 
-            x='Quantidade', 
-            y='NMServico', 
-            orientation='h',
-            title="Top 10 Serviços mais realizados em Odontologia",
-            color='Quantidade',
-            color_continuous_scale='Viridis'
-        )
-        fig5.update_layout(
-            yaxis={'categoryorder':'total ascending'},
-            xaxis_title="Quantidade",
-            yaxis_title="Serviço",
-            xaxis=dict(separatethousands=True)
-        )
-        # Formatação dos valores no hover
-        fig5.update_traces(
-            hovertemplate='<b>%{y}</b><br>Quantidade: %{x:,.0f}'.replace(',', '.')
-        )
-        st.plotly_chart(fig5, use_container_width=True)
+            # 4. Gráfico de pizza: Distribuição por Tipo de Atendimento
+            with col2:
+                def _figura():
+                    df_tipo_atendimento = agrupar_soma(cubo_filtrado, 'TipoAtendimento', 'Quantidade')
+                    fig4 = px.pie(
+                        df_tipo_atendimento, 
+                        values='Quantidade', 
+                        names='TipoAtendimento', 
+                        title="Distribuição por Tipo de Atendimento"
+                    )
+                    return fig4
+                fig4 = figura_em_cache(chave_graficos, 'fig4', _figura)
+                st.plotly_chart(fig4, use_container_width=True)
         
-        # 5.1 Gráfico de barras: Top 10 Serviços que mais trouxeram faturamento
-        df_servicos_faturamento = df_filtrado.groupby('NMServico')['Receita'].sum().reset_index().sort_values('Receita', ascending=False).head(10)
-        fig5_1 = px.bar(
-            df_servicos_faturamento, 
-            x='Receita', 
-            y='NMServico', 
-            orientation='h',
-            title="Top 10 Serviços que mais trouxeram faturamento em Odontologia",
-            color='Receita',
-            color_continuous_scale='Viridis'
-        )
-        fig5_1.update_layout(
-            yaxis={'categoryorder':'total ascending'},
-            xaxis_title="Receita (R$)",
-            yaxis_title="Serviço",
-            xaxis=dict(separatethousands=True, tickformat=",.2f", tickprefix="R$ ")
-        )
-        # Formatação dos valores no hover
-        fig5_1.update_traces(
-            hovertemplate='<b>%{y}</b><br>Receita: R$ %{x:,.2f}'.replace(',', 'X').replace('.', ',').replace('X', '.')
-        )
-        st.plotly_chart(fig5_1, use_container_width=True)
+            # 5. Gráfico de barras: Top 10 Serviços mais realizados
+            def _figura():
+                df_servicos = agrupar_soma(cubo_filtrado, 'NMServico', 'Quantidade').sort_values('Quantidade', ascending=False).head(10)
+                fig5 = px.bar(
+                    df_servicos, 
+                    x='Quantidade', 
+                    y='NMServico', 
+                    orientation='h',
+                    title="Top 10 Serviços mais realizados em Odontologia",
+                    color='Quantidade',
+                    color_continuous_scale='Viridis'
+                )
+                fig5.update_layout(
+                    yaxis={'categoryorder':'total ascending'},
+                    xaxis_title="Quantidade",
+                    yaxis_title="Serviço",
+                    xaxis=dict(separatethousands=True)
+                )
+                # Formatação dos valores no hover
+                fig5.update_traces(
+                    hovertemplate='<b>%{y}</b><br>Quantidade: %{x:,.0f}'.replace(',', '.')
+                )
+                return fig5
+            fig5 = figura_em_cache(chave_graficos, 'fig5', _figura)
+            st.plotly_chart(fig5, use_container_width=True)
         
-        # 6. Gráfico de linha: Evolução diária de atendimentos
-        df_diario = df_filtrado.groupby('Dia')['Quantidade'].sum().reset_index()
-        fig6 = px.line(
-            df_diario, 
-            x='Dia', 
-            y='Quantidade', 
-            title="Evolução Diária de Atendimentos em Odontologia",
-            markers=True
-        )
-        fig6.update_layout(
-            xaxis_title="Dia do Mês",
-            yaxis_title="Quantidade",
-            yaxis=dict(separatethousands=True)
-        )
-        # Formatação dos valores no hover
-        fig6.update_traces(
-            hovertemplate='<b>Dia %{x}</b><br>Quantidade: %{y:,.0f}'.replace(',', '.')
-        )
-        st.plotly_chart(fig6, use_container_width=True)
+            # 5.1 Gráfico de barras: Top 10 Serviços que mais trouxeram faturamento
+            def _figura():
+                df_servicos_faturamento = agrupar_soma(cubo_filtrado, 'NMServico', 'Receita').sort_values('Receita', ascending=False).head(10)
+                fig5_1 = px.bar(
+                    df_servicos_faturamento, 
+                    x='Receita', 
+                    y='NMServico', 
+                    orientation='h',
+                    title="Top 10 Serviços que mais trouxeram faturamento em Odontologia",
+                    color='Receita',
+                    color_continuous_scale='Viridis'
+                )
+                fig5_1.update_layout(
+                    yaxis={'categoryorder':'total ascending'},
+                    xaxis_title="Receita (R$)",
+                    yaxis_title="Serviço",
+                    xaxis=dict(separatethousands=True, tickformat=",.2f", tickprefix="R$ ")
+                )
+                # Formatação dos valores no hover
+                fig5_1.update_traces(
+                    hovertemplate='<b>%{y}</b><br>Receita: R$ %{x:,.2f}'.replace(',', 'X').replace('.', ',').replace('X', '.')
+                )
+                return fig5_1
+            fig5_1 = figura_em_cache(chave_graficos, 'fig5_1', _figura)
+            st.plotly_chart(fig5_1, use_container_width=True)
         
-        # -------------------- TABELA DETALHADA --------------------
-        st.header("📋 Tabela Detalhada de Odontologia")
+            # 6. Gráfico de linha: Evolução diária de atendimentos
+            def _figura():
+                # Com mais de um mês, cada mês vira uma linha
+                df_diario = agrupar_soma(cubo_filtrado, ['Mes', 'Dia'], 'Quantidade')
+                fig6 = px.line(
+                    df_diario, 
+                    x='Dia', 
+                    y='Quantidade', 
+                    color='Mes' if len(meses) > 1 else None,
+                    labels={'Mes': 'Mês'},
+                    title="Evolução Diária de Atendimentos em Odontologia",
+                    markers=True
+                )
+                fig6.update_layout(
+                    xaxis_title="Dia do Mês",
+                    yaxis_title="Quantidade",
+                    yaxis=dict(separatethousands=True)
+                )
+                # Formatação dos valores no hover
+                fig6.update_traces(
+                    hovertemplate='<b>Dia %{x}</b><br>Quantidade: %{y:,.0f}'.replace(',', '.')
+                )
+                return fig6
+            fig6 = figura_em_cache(chave_graficos, 'fig6', _figura)
+            st.plotly_chart(fig6, use_container_width=True)
         
-        # Agrupa os dados por Unidade e Tipo de Atendimento
-        df_agrupado = df_filtrado.groupby(['Unidade', 'TipoAtendimento']).agg({
-            'Quantidade': 'sum',
-            'Receita': 'sum'
-        }).reset_index()
+        elif secao == "📋 Tabela Detalhada":
+            # -------------------- TABELA DETALHADA --------------------
+            st.header("📋 Tabela Detalhada de Odontologia")
         
-        # Adiciona coluna de valor médio
-        df_agrupado['Valor Médio'] = df_agrupado['Receita'] / df_agrupado['Quantidade']
+            # Agrupa os dados por Unidade e Tipo de Atendimento
+            df_agrupado = agrupar_soma(cubo_filtrado, ['Unidade', 'TipoAtendimento'], ['Quantidade', 'Receita'])
         
-        # Ordena por quantidade
-        df_agrupado = df_agrupado.sort_values('Quantidade', ascending=False)
+            # Adiciona coluna de valor médio
+            df_agrupado['Valor Médio'] = df_agrupado['Receita'] / df_agrupado['Quantidade']
         
-        # Exibe a tabela
-        st.dataframe(df_agrupado, use_container_width=True)
+            # Ordena por quantidade
+            df_agrupado = df_agrupado.sort_values('Quantidade', ascending=False)
         
-        # -------------------- DOWNLOAD DOS DADOS FILTRADOS --------------------
-        st.header("⬇️ Baixar Dados Filtrados de Odontologia")
+            # Exibe a tabela
+            st.dataframe(df_agrupado, use_container_width=True)
         
-        # Opções de formato para download
-        col1, col2 = st.columns(2)
+        else:
+            # -------------------- DOWNLOAD DOS DADOS FILTRADOS --------------------
+            st.header("⬇️ Baixar Dados Filtrados de Odontologia")
         
-        # Download CSV
-        with col1:
-            csv = df_filtrado.to_csv(index=False).encode("utf-8-sig")
-            st.download_button("Download CSV", csv, "odontologia_filtrado.csv", "text/csv")
-        
-        # Download Excel
-        with col2:
-            # Cria um buffer para o arquivo Excel
-            buffer = io.BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                df_filtrado.to_excel(writer, index=False, sheet_name='Odontologia')
-                # Ajusta automaticamente a largura das colunas
-                for column in df_filtrado.columns:
-                    column_width = max(df_filtrado[column].astype(str).map(len).max(), len(column)) + 2
-                    col_idx = df_filtrado.columns.get_loc(column)
-                    writer.sheets['Odontologia'].column_dimensions[chr(65 + col_idx)].width = column_width
-            
-            buffer.seek(0)
-            st.download_button("Download Excel", buffer, "odontologia_filtrado.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            # Os arquivos só são gerados quando pedidos (ver utils/exportacao.py)
+            botoes_download(
+                versao_dados(planilhas, meses, subarea),
+                filtros,
+                lambda: selecao.linhas(filtros),
+                "odontologia_filtrado",
+                'Odontologia',
+                FORMATOS_SUBAREA
+            )
 
     else:
-        st.warning("O arquivo está vazio ou não pôde ser lido.")
+        st.warning("Não há dados para os meses selecionados.")
+elif planilhas:
+    st.warning("Selecione ao menos um mês na barra lateral.")
 else:
-    st.error(f"Arquivo não encontrado: {file_path}")
-    st.info("Verifique se o arquivo Excel está no diretório correto.")
\ No newline at end of file
+    st.error(f"Nenhuma planilha encontrada em {DIRETORIO_DADOS} ({PADRAO_PLANILHAS}).")
+    st.info("Verifique se os arquivos Excel estão no diretório correto.")
+
+# Painel e registro dos tempos, no modo de depuração
+finalizar_medicao()
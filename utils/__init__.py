@@ -0,0 +1,3 @@
+"""
+Módulos compartilhados entre o Home.py e os dashboards das subáreas.
+"""
@@ -0,0 +1,592 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import hashlib
+import json
+import os
+import shutil
+from itertools import islice
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+# Diretório onde ficam os arquivos colunares gerados a partir das planilhas
+DIRETORIO_CACHE = ".dados_cache"
+
+# Chave dos metadados do Parquet que guarda o hash da planilha de origem
+CHAVE_HASH_FONTE = b"fonte_sha256"
+
+# Versão do formato gravado; incrementar sempre que a tipagem mudar, para
+# que os Parquets antigos sejam regerados
+VERSAO_FORMATO = "6"
+CHAVE_VERSAO = b"versao_formato"
+
+# Nome do arquivo com o hash da planilha e a versão do formato, gravado na
+# raiz de cada dataset particionado (arquivos com "_" são ignorados na leitura)
+ARQUIVO_MANIFESTO = "_manifesto.json"
+
+# Colunas pelas quais os dados de cada planilha são particionados em disco:
+# primeiro o mês (AAAA-MM, derivado de dataRealizado), depois a subárea
+COLUNA_MES = 'Mes'
+COLUNAS_PARTICAO = [COLUNA_MES, 'Subarea']
+
+# Linhas da planilha convertidas de cada vez; limita a memória da conversão
+LINHAS_POR_BLOCO = int(os.environ.get("DASH_LINHAS_POR_BLOCO", 50_000))
+
+# Coluna dos Parquets auxiliares com a assinatura da partição de origem
+COLUNA_ASSINATURA = 'Assinatura'
+
+# Colunas de texto com poucos valores distintos, guardadas como categóricas
+COLUNAS_DIMENSAO = ['Unidade', 'Categoria', 'Subarea', 'TipoAtendimento', 'TipoServico', 'NMServico']
+
+# Chave dos metadados do arquivo Arrow com o intervalo de linhas de cada subárea
+CHAVE_SUBAREAS = b"subareas"
+
+
+# -------------------------- HASH DA PLANILHA --------------------------
+def hash_arquivo(file_path, tamanho_bloco=1 << 20):
+    """
+    Calcula o SHA-256 do conteúdo do arquivo, lendo em blocos de 1 MB.
+    """
+    sha = hashlib.sha256()
+    with open(file_path, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def caminho_parquet(file_path, sufixo):
+    """
+    Retorna o caminho de um Parquet auxiliar derivado da planilha (ex.:
+    resumos), gravado ao lado do dataset.
+    """
+    nome = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(DIRETORIO_CACHE, f"{nome}.{sufixo}.parquet")
+
+
+def caminho_dataset(file_path):
+    """
+    Retorna o diretório do dataset particionado da planilha.
+    """
+    nome = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(DIRETORIO_CACHE, nome)
+
+
+def caminho_arrow(file_path):
+    """
+    Retorna o diretório dos arquivos Arrow (um por mês) da planilha, mapeados
+    em memória na leitura (ver ler_arrow).
+    """
+    nome = os.path.splitext(os.path.basename(file_path))[0]
+    return os.path.join(DIRETORIO_CACHE, f"{nome}.arrow")
+
+
+def chave_particao(valores):
+    """
+    Retorna o caminho relativo da partição (ex.: 'Mes=2025-08/Subarea=S.S.T'),
+    usado também como chave das partições no manifesto.
+    """
+    return "/".join(
+        f"{coluna}={quote(str(valor), safe='')}"
+        for coluna, valor in zip(COLUNAS_PARTICAO, valores)
+    )
+
+
+# -------------------------- LEITURA DA PLANILHA EM BLOCOS --------------------------
+def ler_planilha_em_blocos(file_path, linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Percorre a primeira aba da planilha em modo somente leitura do openpyxl
+    e devolve, um de cada vez, DataFrames de até `linhas_por_bloco` linhas
+    já tipados (ver tipar_colunas). Só as linhas de um bloco ficam em
+    memória como objetos Python, independentemente do tamanho da planilha.
+    """
+    planilha = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        linhas = planilha.worksheets[0].iter_rows(values_only=True)
+        cabecalho = [str(nome) for nome in next(linhas)]
+        while True:
+            # Só o fim da aba encerra a leitura: linhas em branco (formatadas,
+            # sem valores) são descartadas, mas pode haver dados depois delas
+            brutas = list(islice(linhas, linhas_por_bloco))
+            if not brutas:
+                break
+            bloco = [linha for linha in brutas if any(valor is not None for valor in linha)]
+            if not bloco:
+                continue
+            yield tipar_colunas(pd.DataFrame.from_records(bloco, columns=cabecalho))
+    finally:
+        planilha.close()
+
+
+def tipar_colunas(df):
+    """
+    Garante os tipos das colunas de origem antes da gravação em Parquet.
+
+    As dimensões viram categóricas (gravadas como dicionário no Parquet) e
+    Quantidade/CDServico viram inteiros; o menor tipo inteiro que comporta
+    os valores é escolhido na leitura (ver compactar_inteiros).
+    """
+    df['dataRealizado'] = pd.to_datetime(df['dataRealizado'])
+    df['Quantidade'] = pd.to_numeric(df['Quantidade']).astype('int64')
+    df['CDServico'] = pd.to_numeric(df['CDServico']).astype('int64')
+    df['ValorUnitario'] = df['ValorUnitario'].astype('float64')
+    for coluna in COLUNAS_DIMENSAO:
+        df[coluna] = df[coluna].astype('category')
+    return df
+
+
+def compactar_inteiros(df):
+    """
+    Converte as colunas inteiras para o menor tipo que comporta os valores.
+    """
+    for coluna in df.columns:
+        if pd.api.types.is_integer_dtype(df[coluna].dtype):
+            df[coluna] = pd.to_numeric(df[coluna], downcast='integer')
+    return df
+
+
+def hash_linhas(df):
+    """
+    Retorna o hash (uint64) do conteúdo de cada linha. Depende só dos
+    valores, não de como as categorias ou os inteiros estão tipados.
+    """
+    inteiros = {coluna: 'int64' for coluna in df.columns if pd.api.types.is_integer_dtype(df[coluna].dtype)}
+    return pd.util.hash_pandas_object(df.astype(inteiros), index=False).to_numpy()
+
+
+def _esquema_armazenado(esquema):
+    # Tipos fixos para todos os blocos, já que cada bloco pode ter inferido
+    # um tipo diferente (ex.: índices de dicionário int8 ou int16)
+    campos = []
+    for campo in esquema:
+        tipo = campo.type
+        if pa.types.is_dictionary(tipo):
+            tipo = pa.dictionary(pa.int32(), pa.string())
+        elif pa.types.is_integer(tipo):
+            tipo = pa.int64()
+        elif pa.types.is_null(tipo):
+            tipo = pa.string()
+        campos.append(pa.field(campo.name, tipo))
+    return pa.schema(campos)
+
+
+# -------------------------- CONVERSÃO EXCEL -> PARQUET --------------------------
+def _gravar_manifesto(raiz, manifesto):
+    temporario = os.path.join(raiz, f"_{ARQUIVO_MANIFESTO}.{os.getpid()}.tmp")
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, indent=2)
+    os.replace(temporario, os.path.join(raiz, ARQUIVO_MANIFESTO))
+
+
+def converter_para_parquet(file_path, hash_fonte=None, anterior=None, blocos=None):
+    """
+    Lê a planilha em blocos (ver ler_planilha_em_blocos) e grava um dataset
+    Parquet particionado por mês e subárea (Mes=<AAAA-MM>/Subarea=<valor>/...),
+    um grupo de linhas por bloco. O manifesto registra o hash da planilha,
+    os meses presentes e a assinatura de cada partição (SHA-256 dos hashes
+    das linhas, na ordem). Retorna o manifesto gravado.
+
+    Com o manifesto `anterior` do dataset, a atualização é incremental: só
+    as partições cuja assinatura mudou são substituídas, e as que deixaram
+    de existir são removidas.
+
+    `blocos`, se informado, substitui a leitura da planilha: um iterável de
+    DataFrames já tipados, como os dados sintéticos de utils/sintetico.py
+    (nesse caso, `hash_fonte` identifica os dados e é obrigatório).
+    """
+    if hash_fonte is None:
+        hash_fonte = hash_arquivo(file_path)
+    if blocos is None:
+        blocos = ler_planilha_em_blocos(file_path)
+
+    destino = caminho_dataset(file_path)
+    if anterior is None:
+        # Dataset novo: grava em um diretório temporário e troca pelo
+        # definitivo no final, para que outro processo nunca leia um dataset
+        # pela metade
+        raiz = f"{destino}.{os.getpid()}.tmp"
+        shutil.rmtree(raiz, ignore_errors=True)
+        os.makedirs(raiz)
+        particoes_anteriores = {}
+    else:
+        raiz = destino
+        particoes_anteriores = anterior['particoes']
+
+    # Cada partição é gravada em um arquivo temporário (ignorado na leitura
+    # por começar com ".") que só substitui o definitivo no final
+    escritores = {}
+    assinaturas = {}
+    particoes = {}
+    colunas = None
+    esquema = None
+    try:
+        for bloco in blocos:
+            colunas = bloco.columns.tolist()
+            hashes = hash_linhas(bloco)
+            meses = bloco['dataRealizado'].dt.strftime('%Y-%m').rename(COLUNA_MES)
+
+            for valores, posicoes in bloco.groupby([meses, 'Subarea'], observed=True).indices.items():
+                chave = chave_particao(valores)
+                if chave not in particoes:
+                    particoes[chave] = {'mes': valores[0], 'subarea': str(valores[1]), 'linhas': 0}
+                    assinaturas[chave] = hashlib.sha256()
+                particoes[chave]['linhas'] += len(posicoes)
+                assinaturas[chave].update(hashes[posicoes].tobytes())
+
+                tabela = pa.Table.from_pandas(bloco.iloc[posicoes], preserve_index=False)
+                if esquema is None:
+                    esquema = _esquema_armazenado(tabela.schema)
+                if chave not in escritores:
+                    pasta = os.path.join(raiz, *chave.split("/"))
+                    os.makedirs(pasta, exist_ok=True)
+                    temporario = os.path.join(pasta, f".parte-0.parquet.{os.getpid()}.tmp")
+                    escritores[chave] = (pq.ParquetWriter(temporario, esquema), temporario)
+                escritores[chave][0].write_table(tabela.cast(esquema))
+    except Exception:
+        for escritor, temporario in escritores.values():
+            escritor.close()
+            os.remove(temporario)
+        if anterior is None:
+            shutil.rmtree(raiz, ignore_errors=True)
+        raise
+
+    for chave, (escritor, temporario) in escritores.items():
+        escritor.close()
+        assinatura = assinaturas[chave].hexdigest()[:32]
+        particoes[chave]['assinatura'] = assinatura
+        if particoes_anteriores.get(chave, {}).get('assinatura') == assinatura:
+            os.remove(temporario)
+        else:
+            os.replace(temporario, os.path.join(os.path.dirname(temporario), "parte-0.parquet"))
+
+    for chave in particoes_anteriores.keys() - particoes.keys():
+        shutil.rmtree(os.path.join(raiz, *chave.split("/")), ignore_errors=True)
+    for pasta in os.listdir(raiz):
+        caminho = os.path.join(raiz, pasta)
+        if os.path.isdir(caminho) and not os.listdir(caminho):
+            os.rmdir(caminho)
+
+    manifesto = {
+        'fonte_sha256': hash_fonte,
+        'versao_formato': VERSAO_FORMATO,
+        'colunas': colunas,
+        'meses': sorted({particao['mes'] for particao in particoes.values()}),
+        'linhas': sum(particao['linhas'] for particao in particoes.values()),
+        'particoes': particoes,
+    }
+    _gravar_manifesto(raiz, manifesto)
+
+    if anterior is None:
+        antigo = f"{destino}.{os.getpid()}.old"
+        if os.path.exists(destino):
+            os.replace(destino, antigo)
+        os.replace(raiz, destino)
+        shutil.rmtree(antigo, ignore_errors=True)
+    return manifesto
+
+
+def gravar_parquet(df, destino, hash_fonte):
+    """
+    Grava o DataFrame em Parquet registrando nos metadados o hash da
+    planilha de origem e a versão do formato.
+    """
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[CHAVE_HASH_FONTE] = hash_fonte.encode()
+    metadados[CHAVE_VERSAO] = VERSAO_FORMATO.encode()
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    # Grava em um arquivo temporário e renomeia, para que outro processo
+    # nunca leia um Parquet pela metade
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    pq.write_table(tabela, temporario)
+    os.replace(temporario, destino)
+
+
+def hash_registrado(destino):
+    """
+    Retorna o hash da planilha registrado no Parquet, ou None se o arquivo
+    não existir ou tiver sido gravado em outra versão do formato.
+    """
+    if not os.path.exists(destino):
+        return None
+    metadados = pq.read_schema(destino).metadata or {}
+    if metadados.get(CHAVE_VERSAO) != VERSAO_FORMATO.encode():
+        return None
+    valor = metadados.get(CHAVE_HASH_FONTE)
+    return valor.decode() if valor else None
+
+
+def ler_manifesto(file_path):
+    """
+    Retorna o manifesto do dataset da planilha, ou None se ele não existir
+    ou tiver sido gravado em outra versão do formato.
+    """
+    caminho = os.path.join(caminho_dataset(file_path), ARQUIVO_MANIFESTO)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as arquivo:
+        manifesto = json.load(arquivo)
+    if manifesto.get('versao_formato') != VERSAO_FORMATO:
+        return None
+    return manifesto
+
+
+def sincronizar_planilha(file_path, hash_fonte=None):
+    """
+    Garante que o dataset da planilha esteja atualizado. Se ele não existir,
+    a planilha é convertida; se tiver sido gerado a partir de outra versão
+    da planilha, só as partições alteradas são regravadas. Retorna o
+    manifesto.
+    """
+    if hash_fonte is None:
+        hash_fonte = hash_arquivo(file_path)
+    manifesto = ler_manifesto(file_path)
+    if manifesto is None or manifesto['fonte_sha256'] != hash_fonte:
+        manifesto = converter_para_parquet(file_path, hash_fonte, manifesto)
+    sincronizar_arrow(file_path, manifesto)
+    return manifesto
+
+
+# -------------------------- ARQUIVOS ARROW MAPEADOS EM MEMÓRIA --------------------------
+def assinatura_mes(manifesto, mes):
+    """
+    Retorna a assinatura de um mês do dataset: o SHA-256 das assinaturas das
+    suas partições e da versão do formato. Compõe o nome do arquivo Arrow
+    do mês, então um mês alterado gera um arquivo novo em vez de sobrescrever
+    um que outro processo pode estar mapeando.
+    """
+    sha = hashlib.sha256(VERSAO_FORMATO.encode())
+    for chave in sorted(manifesto['particoes']):
+        particao = manifesto['particoes'][chave]
+        if particao['mes'] == mes:
+            sha.update(f"{chave}={particao['assinatura']};".encode())
+    return sha.hexdigest()[:32]
+
+
+def arquivo_arrow(file_path, manifesto, mes):
+    """
+    Retorna o caminho do arquivo Arrow do mês na versão atual do dataset.
+    """
+    return os.path.join(caminho_arrow(file_path), f"{mes}.{assinatura_mes(manifesto, mes)}.arrow")
+
+
+def gravar_arrow_mes(file_path, manifesto, mes):
+    """
+    Grava as linhas do mês em um arquivo Arrow IPC (Feather v2) sem
+    compressão, em um único lote e ordenadas por subárea, já com os tipos
+    usados pelos dashboards (inteiros compactados, dimensões como
+    dicionário). Os metadados registram o intervalo de linhas de cada
+    subárea, para que a leitura de uma subárea seja só um recorte.
+    """
+    df = ler_particoes([file_path], meses=[mes], mapeado=False)
+    subareas = df['Subarea'].astype(str)
+    ordem = np.argsort(subareas.to_numpy(), kind='stable')
+    df = df.iloc[ordem].reset_index(drop=True)
+
+    intervalos = {}
+    inicio = 0
+    for nome, linhas in subareas.value_counts(sort=False).sort_index().items():
+        intervalos[nome] = [inicio, inicio + int(linhas)]
+        inicio += int(linhas)
+
+    tabela = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    metadados = dict(tabela.schema.metadata or {})
+    metadados[CHAVE_SUBAREAS] = json.dumps(intervalos, ensure_ascii=False).encode()
+    tabela = tabela.replace_schema_metadata(metadados)
+
+    destino = arquivo_arrow(file_path, manifesto, mes)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = f"{destino}.{os.getpid()}.tmp"
+    with pa.OSFile(temporario, "wb") as arquivo:
+        with pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+            escritor.write_table(tabela, max_chunksize=max(len(tabela), 1))
+    os.replace(temporario, destino)
+
+
+def sincronizar_arrow(file_path, manifesto):
+    """
+    Grava os arquivos Arrow dos meses que ainda não têm um na versão atual
+    do dataset e apaga os das versões anteriores. Um arquivo ainda mapeado
+    por outro processo continua válido para ele até ser liberado; se o
+    sistema não permitir apagá-lo (Windows), fica para a próxima
+    sincronização.
+    """
+    atuais = set()
+    for mes in manifesto['meses']:
+        destino = arquivo_arrow(file_path, manifesto, mes)
+        atuais.add(os.path.basename(destino))
+        if not os.path.exists(destino):
+            gravar_arrow_mes(file_path, manifesto, mes)
+
+    pasta = caminho_arrow(file_path)
+    if not os.path.isdir(pasta):
+        return
+    for nome in set(os.listdir(pasta)) - atuais:
+        try:
+            os.remove(os.path.join(pasta, nome))
+        except OSError:
+            pass
+
+
+def _esquema_comum(esquemas):
+    # Cada arquivo compacta os inteiros (e os índices dos dicionários) para o
+    # menor tipo que comporta os seus valores; ao juntar arquivos, usa o maior
+    campos = []
+    for campos_iguais in zip(*esquemas):
+        tipo = campos_iguais[0].type
+        for campo in campos_iguais[1:]:
+            outro = campo.type
+            if pa.types.is_dictionary(tipo) and outro.index_type.bit_width > tipo.index_type.bit_width:
+                tipo = outro
+            elif pa.types.is_integer(tipo) and outro.bit_width > tipo.bit_width:
+                tipo = outro
+        campos.append(pa.field(campos_iguais[0].name, tipo))
+    return pa.schema(campos)
+
+
+def ler_arrow(planilhas, meses, subarea=None):
+    """
+    Lê as linhas dos `meses` (e da `subarea`) mapeando em memória os arquivos
+    Arrow das planilhas, ou retorna None se algum deles ainda não existir.
+
+    Com um único arquivo (uma planilha e um mês), as colunas do DataFrame
+    apontam direto para as páginas mapeadas, sem cópia: são somente
+    leitura, e vários processos que leem o mesmo arquivo compartilham a
+    mesma memória (o cache de páginas do sistema). Ao juntar mais de um
+    arquivo, as colunas são concatenadas em memória do processo.
+    """
+    tabelas = []
+    for file_path in planilhas:
+        manifesto = ler_manifesto(file_path)
+        if manifesto is None:
+            return None
+        for mes in sorted(set(meses) & set(manifesto['meses'])):
+            caminho = arquivo_arrow(file_path, manifesto, mes)
+            if not os.path.exists(caminho):
+                return None
+            tabela = pa.ipc.open_file(pa.memory_map(caminho)).read_all()
+            if subarea is not None:
+                intervalos = json.loads(tabela.schema.metadata[CHAVE_SUBAREAS])
+                if subarea not in intervalos:
+                    continue
+                inicio, fim = intervalos[subarea]
+                tabela = tabela.slice(inicio, fim - inicio)
+            tabelas.append(tabela.replace_schema_metadata(None))
+    if not tabelas:
+        return None
+
+    if len(tabelas) > 1:
+        esquema = _esquema_comum([tabela.schema for tabela in tabelas])
+        tabela = pa.concat_tables([tabela.cast(esquema) for tabela in tabelas])
+    else:
+        tabela = tabelas[0]
+    # split_blocks evita juntar as colunas em blocos 2D, o que as copiaria;
+    # os dicionários de arquivos diferentes são unificados na conversão
+    return tabela.to_pandas(split_blocks=True)
+
+
+# -------------------------- LEITURA DOS DATASETS --------------------------
+def ler_particoes(planilhas, meses=None, subarea=None, colunas=None, particoes=None, mapeado=True):
+    """
+    Lê, dos datasets já sincronizados das planilhas, apenas as partições dos
+    `meses` (lista de 'AAAA-MM') e da `subarea` pedidos, ou as `particoes`
+    (lista de pares (mês, subárea)); com `colunas`, só essas colunas. Sem
+    filtros, lê tudo.
+
+    Leituras de meses inteiros (com ou sem `subarea`) vêm dos arquivos Arrow
+    mapeados em memória (ver ler_arrow), salvo com `mapeado=False` ou se eles
+    ainda não existirem; as demais, dos Parquets. As categorias das colunas
+    categóricas são unificadas entre planilhas.
+    """
+    if mapeado and meses and colunas is None and particoes is None:
+        df = ler_arrow(planilhas, meses, subarea)
+        if df is not None:
+            return df
+
+    particionamento = ds.HivePartitioning.discover(infer_dictionary=True)
+    dataset = ds.dataset([
+        ds.dataset(caminho_dataset(file_path), format='parquet', partitioning=particionamento)
+        for file_path in planilhas
+    ])
+
+    filtro = None
+    if meses:
+        filtro = ds.field(COLUNA_MES).isin(list(meses))
+    if subarea is not None:
+        por_subarea = ds.field('Subarea') == subarea
+        filtro = por_subarea if filtro is None else filtro & por_subarea
+    if particoes is not None:
+        por_particao = None
+        for mes, nome in particoes:
+            condicao = (ds.field(COLUNA_MES) == mes) & (ds.field('Subarea') == nome)
+            por_particao = condicao if por_particao is None else por_particao | condicao
+        filtro = por_particao if filtro is None else filtro & por_particao
+
+    if colunas is None:
+        manifesto = ler_manifesto(planilhas[0])
+        colunas = manifesto['colunas'] + [COLUNA_MES]
+    return compactar_inteiros(dataset.to_table(columns=colunas, filter=filtro).to_pandas())
+
+
+# -------------------------- PARQUETS AUXILIARES --------------------------
+def ler_auxiliar(file_path, sufixo, hash_fonte):
+    """
+    Lê um Parquet auxiliar derivado da planilha (ex.: o resumo por subárea).
+    Retorna None se ele não existir ou tiver sido gerado a partir de outra
+    versão da planilha.
+    """
+    destino = caminho_parquet(file_path, sufixo)
+    if hash_registrado(destino) != hash_fonte:
+        return None
+    return pd.read_parquet(destino)
+
+
+def gravar_auxiliar(file_path, sufixo, df, hash_fonte):
+    """
+    Grava um Parquet auxiliar derivado da versão `hash_fonte` da planilha.
+    """
+    gravar_parquet(df, caminho_parquet(file_path, sufixo), hash_fonte)
+
+
+def atualizar_auxiliar(file_path, sufixo, agregar):
+    """
+    Mantém um Parquet auxiliar agregado por partição: `agregar` recebe as
+    linhas de algumas partições e devolve um DataFrame com as colunas Mes e
+    Subarea. Cada linha agregada guarda a assinatura da partição de origem,
+    então, quando a planilha muda, só as partições alteradas são lidas e
+    reagregadas; as demais são reaproveitadas. Retorna o agregado atualizado.
+    """
+    manifesto = ler_manifesto(file_path)
+    destino = caminho_parquet(file_path, sufixo)
+    registrado = hash_registrado(destino)
+    anterior = pd.read_parquet(destino) if registrado is not None else None
+    if registrado == manifesto['fonte_sha256']:
+        return anterior
+
+    assinaturas = {(p['mes'], p['subarea']): p['assinatura'] for p in manifesto['particoes'].values()}
+    partes = []
+    validas = set()
+    if anterior is not None:
+        chaves = list(zip(anterior[COLUNA_MES].astype(str), anterior['Subarea'].astype(str)))
+        mantidas = [assinaturas.get(chave) == assinatura for chave, assinatura in zip(chaves, anterior[COLUNA_ASSINATURA])]
+        partes.append(anterior[mantidas])
+        validas = {chave for chave, mantida in zip(chaves, mantidas) if mantida}
+
+    pendentes = [chave for chave in assinaturas if chave not in validas]
+    if pendentes:
+        novo = agregar(ler_particoes([file_path], particoes=pendentes))
+        chaves = zip(novo[COLUNA_MES].astype(str), novo['Subarea'].astype(str))
+        novo[COLUNA_ASSINATURA] = [assinaturas[chave] for chave in chaves]
+        partes.append(novo)
+
+    agregado = pd.concat(partes, ignore_index=True)
+    agregado[COLUNA_MES] = agregado[COLUNA_MES].astype(str)
+    agregado['Subarea'] = agregado['Subarea'].astype(str)
+    agregado = agregado.sort_values([COLUNA_MES, 'Subarea'], ignore_index=True)
+    gravar_parquet(agregado, destino, manifesto['fonte_sha256'])
+    return agregado
@@ -0,0 +1,270 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+
+from utils.armazenamento import converter_para_parquet, ler_manifesto, ler_particoes, sincronizar_arrow
+from utils.cubo import construir_cubo, kpis, mapa_calor
+from utils.dados import agrupar_soma, enriquecer_dados
+from utils.exportacao import FORMATOS, FORMATOS_SUBAREA, gerar_formato
+from utils.filtros import IndiceFiltros
+from utils.formatacao import formatar_moeda_coluna, formatar_numero_coluna
+from utils.sintetico import TAMANHOS, gerar_blocos, identificador
+
+# Páginas medidas e a subárea de cada uma (None: todas, como no Home)
+PAGINAS = {
+    'Home': None,
+    'Central de Atendimento': 'Central de Atendimento',
+    'Especialidades Médicas': 'Especialidades Médicas',
+    'Odontologia': 'Odontologia',
+    'S.S.T': 'S.S.T',
+}
+
+# Raiz do repositório, usada para identificar o commit medido
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# -------------------------- MEDIÇÃO --------------------------
+def medir(funcao, repeticoes):
+    """
+    Executa `funcao` `repeticoes` vezes e retorna (último resultado, tempos
+    em segundos).
+    """
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, tempos
+
+
+def _graficos(cubo, home):
+    # As mesmas agregações dos gráficos das páginas, sobre o cubo filtrado
+    graficos = {
+        'kpis': lambda: kpis(cubo),
+        'grafico_quantidade_unidade': lambda: agrupar_soma(cubo, 'Unidade', 'Quantidade').sort_values('Quantidade', ascending=False),
+        'grafico_receita_unidade': lambda: agrupar_soma(cubo, 'Unidade', 'Receita').sort_values('Receita', ascending=False),
+        'grafico_categoria': lambda: agrupar_soma(cubo, 'Categoria', 'Quantidade'),
+        'grafico_tipo_atendimento': lambda: agrupar_soma(cubo, 'TipoAtendimento', 'Quantidade'),
+        'grafico_top10_quantidade': lambda: agrupar_soma(cubo, 'NMServico', 'Quantidade').sort_values('Quantidade', ascending=False).head(10),
+        'grafico_top10_receita': lambda: agrupar_soma(cubo, 'NMServico', 'Receita').sort_values('Receita', ascending=False).head(10),
+        'grafico_diario': lambda: agrupar_soma(cubo, ['Mes', 'Dia'], 'Quantidade'),
+    }
+    if home:
+        graficos['mapa_calor'] = lambda: mapa_calor(cubo)
+    return graficos
+
+
+def _tabela(cubo, home):
+    # A tabela detalhada da página; só o Home formata os números como texto
+    por = ['Unidade', 'Subarea', 'TipoAtendimento'] if home else ['Unidade', 'TipoAtendimento']
+    df_agrupado = agrupar_soma(cubo, por, ['Quantidade', 'Receita'])
+    df_agrupado['Valor Médio'] = df_agrupado['Receita'] / df_agrupado['Quantidade']
+    df_agrupado = df_agrupado.sort_values('Quantidade', ascending=False)
+    if home:
+        df_agrupado['Quantidade'] = formatar_numero_coluna(df_agrupado['Quantidade'])
+        df_agrupado['Receita'] = formatar_moeda_coluna(df_agrupado['Receita'])
+        df_agrupado['Valor Médio'] = formatar_moeda_coluna(df_agrupado['Valor Médio'])
+    return df_agrupado
+
+
+def medir_pagina(file_path, meses, pagina, subarea, repeticoes=3, formatos=None):
+    """
+    Mede, para uma página, as etapas que ela executa sem cache: leitura das
+    linhas, montagem do cubo e dos índices, filtragem, a agregação de cada
+    gráfico, a tabela detalhada e cada formato de download.
+
+    Os filtros são a primeira unidade e o primeiro tipo de atendimento; os
+    downloads usam todas as linhas da página (a seleção padrão, sem
+    filtros). Retorna uma lista de {'pagina', 'etapa', 'segundos' (menor
+    tempo), 'mediana', 'tempos', 'linhas' (da página)}.
+    """
+    home = subarea is None
+    if formatos is None:
+        formatos = tuple(FORMATOS) if home else FORMATOS_SUBAREA
+    resultados = []
+
+    def registrar(etapa, funcao):
+        resultado, tempos = medir(funcao, repeticoes)
+        resultados.append({
+            'pagina': pagina,
+            'etapa': etapa,
+            'segundos': min(tempos),
+            'mediana': statistics.median(tempos),
+            'tempos': tempos,
+        })
+        print(f"  {pagina:<24} {etapa:<28} {min(tempos) * 1000:10.1f} ms", flush=True)
+        return resultado
+
+    df = registrar('carga', lambda: enriquecer_dados(ler_particoes([file_path], meses, subarea)))
+    if df.empty:
+        return resultados
+    cubo = registrar('cubo', lambda: construir_cubo(df))
+    indice_linhas, indice_cubo = registrar('indices', lambda: (IndiceFiltros(df), IndiceFiltros(cubo)))
+
+    filtros = {
+        'Unidade': indice_cubo.valores('Unidade')[0],
+        'TipoAtendimento': indice_cubo.valores('TipoAtendimento')[0],
+    }
+    cubo_filtrado = registrar('filtragem', lambda: indice_cubo.filtrar(cubo, filtros))
+    registrar('filtragem_linhas', lambda: indice_linhas.filtrar(df, filtros))
+
+    for etapa, funcao in _graficos(cubo_filtrado, home).items():
+        registrar(etapa, funcao)
+    registrar('tabela', lambda: _tabela(cubo_filtrado, home))
+
+    for formato in formatos:
+        registrar(f"exportacao_{formato}", lambda: gerar_formato(df, formato, 'Dados'))
+
+    for resultado in resultados:
+        resultado['linhas'] = len(df)
+    return resultados
+
+
+def preparar_dataset(linhas, semente, meses):
+    """
+    Grava o dataset sintético de `linhas` linhas no armazenamento colunar do
+    diretório atual (Parquet particionado e arquivos Arrow), se ainda não
+    estiver lá. Retorna (caminho da planilha fictícia, segundos gastos ou
+    None se o dataset foi reaproveitado).
+    """
+    file_path = f"Analise_Sintetico_{linhas}_{semente}.xlsx"
+    hash_fonte = identificador(linhas, semente, meses)
+    manifesto = ler_manifesto(file_path)
+    if manifesto is not None and manifesto['fonte_sha256'] == hash_fonte:
+        return file_path, None
+
+    inicio = time.perf_counter()
+    manifesto = converter_para_parquet(file_path, hash_fonte, blocos=gerar_blocos(linhas, semente, meses))
+    sincronizar_arrow(file_path, manifesto)
+    return file_path, time.perf_counter() - inicio
+
+
+def commit_atual():
+    """
+    Retorna o hash abreviado do commit do repositório, ou None fora do git.
+    """
+    try:
+        resultado = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=RAIZ_REPOSITORIO, capture_output=True, text=True, check=True
+        )
+        return resultado.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# -------------------------- COMPARAÇÃO --------------------------
+def comparar(anterior, atual):
+    """
+    Exibe, para cada etapa medida nas duas execuções, o menor tempo de cada
+    uma e a variação percentual.
+    """
+    def chave(resultado):
+        return resultado['tamanho'], resultado['pagina'], resultado['etapa']
+
+    tempos_anteriores = {chave(resultado): resultado['segundos'] for resultado in anterior['resultados']}
+    print(f"Comparação com {anterior.get('commit') or 'execução anterior'} ({anterior.get('data')}):")
+    for resultado in atual['resultados']:
+        antes = tempos_anteriores.get(chave(resultado))
+        if not antes:
+            continue
+        depois = resultado['segundos']
+        variacao = (depois - antes) / antes * 100
+        tamanho, pagina, etapa = chave(resultado)
+        print(f"  {tamanho:<5} {pagina or '(ingestão)':<24} {etapa:<28} "
+              f"{antes * 1000:10.1f} ms -> {depois * 1000:10.1f} ms ({variacao:+.1f}%)")
+
+
+# -------------------------- LINHA DE COMANDO --------------------------
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Mede carga, filtragem, gráficos, tabela e downloads dos dashboards com dados sintéticos."
+    )
+    parser.add_argument("-t", "--tamanhos", nargs="+", default=['10k', '100k', '1M'], choices=list(TAMANHOS),
+                        help="tamanhos dos datasets (padrão: 10k 100k 1M)")
+    parser.add_argument("-p", "--paginas", nargs="+", default=list(PAGINAS), choices=list(PAGINAS),
+                        help="páginas medidas (padrão: todas)")
+    parser.add_argument("-f", "--formatos", nargs="+", choices=list(FORMATOS),
+                        help="formatos de download medidos (padrão: os de cada página)")
+    parser.add_argument("-r", "--repeticoes", type=int, default=3, help="execuções de cada etapa")
+    parser.add_argument("-s", "--semente", type=int, default=0, help="semente dos dados sintéticos")
+    parser.add_argument("-m", "--meses", nargs="+", default=['2025-08'], help="meses dos dados (AAAA-MM)")
+    parser.add_argument("-d", "--diretorio",
+                        help="diretório dos datasets, reaproveitados entre execuções (padrão: temporário)")
+    parser.add_argument("-o", "--saida", help="arquivo JSON com os resultados (padrão: benchmark-<commit>.json)")
+    parser.add_argument("-c", "--comparar", help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args(argumentos)
+
+    commit = commit_atual()
+    saida = os.path.abspath(args.saida or f"benchmark-{commit or 'local'}.json")
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+
+    execucao = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'plataforma': platform.platform(),
+        'processadores': os.cpu_count(),
+        'semente': args.semente,
+        'meses': args.meses,
+        'repeticoes': args.repeticoes,
+        'resultados': [],
+    }
+
+    diretorio_temporario = None
+    if args.diretorio:
+        os.makedirs(args.diretorio, exist_ok=True)
+        diretorio = args.diretorio
+    else:
+        diretorio_temporario = tempfile.TemporaryDirectory(prefix="benchmark_")
+        diretorio = diretorio_temporario.name
+    atual = os.getcwd()
+    os.chdir(diretorio)
+    try:
+        for tamanho in args.tamanhos:
+            linhas = TAMANHOS[tamanho]
+            print(f"Dataset {tamanho} ({linhas} linhas)...", flush=True)
+            file_path, segundos = preparar_dataset(linhas, args.semente, args.meses)
+            if segundos is not None:
+                print(f"  {'(ingestão)':<24} {'ingestao':<28} {segundos * 1000:10.1f} ms", flush=True)
+                execucao['resultados'].append({
+                    'tamanho': tamanho, 'pagina': None, 'etapa': 'ingestao', 'segundos': segundos,
+                    'mediana': segundos, 'tempos': [segundos], 'linhas': linhas,
+                })
+            for pagina in args.paginas:
+                for resultado in medir_pagina(file_path, args.meses, pagina, PAGINAS[pagina],
+                                              args.repeticoes, args.formatos):
+                    execucao['resultados'].append({'tamanho': tamanho, **resultado})
+    finally:
+        os.chdir(atual)
+        if diretorio_temporario is not None:
+            diretorio_temporario.cleanup()
+
+    with open(saida, "w", encoding="utf-8") as arquivo:
+        json.dump(execucao, arquivo, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}")
+
+    if anterior is not None:
+        comparar(anterior, execucao)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import glob
+import os
+import re
+
+import duckdb
+import pandas as pd
+import streamlit as st
+
+from utils.armazenamento import COLUNA_MES, COLUNAS_DIMENSAO, caminho_dataset, chave_particao, compactar_inteiros, ler_manifesto
+from utils.instrumentacao import etapa
+from utils.metricas import consulta_cache, falta_cache
+
+# Backend opcional das páginas (DASH_BACKEND=duckdb, ver utils/dados.py):
+# KPIs, gráficos, tabela e downloads respondidos por SQL do DuckDB direto
+# sobre os Parquets das partições selecionadas, sem carregar as linhas nem
+# montar o cubo em memória. Requer o pacote duckdb (pip install duckdb).
+
+# Threads do DuckDB (padrão: uma por processador)
+THREADS_DUCKDB = os.environ.get("DASH_THREADS_DUCKDB", "")
+
+# Máximo de resultados de consultas mantidos em cache
+MAXIMO_CONSULTAS = int(os.environ.get("DASH_MAXIMO_CONSULTAS", 256))
+
+
+# -------------------------- CONEXÃO E CONSULTAS --------------------------
+@st.cache_resource(show_spinner=False)
+def _conexao():
+    # Banco em memória, compartilhado pelo processo; cada consulta usa um
+    # cursor próprio, já que as sessões consultam em threads diferentes
+    conexao = duckdb.connect()
+    if THREADS_DUCKDB:
+        conexao.execute(f"SET threads TO {int(THREADS_DUCKDB)}")
+    return conexao
+
+
+@st.cache_data(show_spinner=False, max_entries=MAXIMO_CONSULTAS)
+def _consultar_em_cache(versao, sql, parametros):
+    # `versao` (as assinaturas das partições) só entra na chave do cache:
+    # uma atualização da planilha invalida as consultas sobre ela
+    with falta_cache('consultas_sql'):
+        return _executar(sql, parametros)
+
+
+def _executar(sql, parametros):
+    with etapa('consulta SQL'), _conexao().cursor() as cursor:
+        return cursor.execute(sql, list(parametros)).df()
+
+
+def _literal(valor):
+    return "'" + str(valor).replace("'", "''") + "'"
+
+
+def _identificador(coluna):
+    return '"' + coluna.replace('"', '""') + '"'
+
+
+def _arquivos(versao):
+    # Arquivos das partições selecionadas, na ordem das linhas em memória:
+    # planilha, mês, subárea (a ordem de `versao`) e parte
+    arquivos = []
+    for file_path, mes, subarea, _ in versao:
+        pasta = os.path.join(caminho_dataset(file_path), chave_particao((mes, subarea)))
+        partes = glob.glob(os.path.join(pasta, "parte-*.parquet"))
+        arquivos.extend(sorted(partes, key=lambda caminho: int(re.search(r"parte-(\d+)", caminho).group(1))))
+    return arquivos
+
+
+def _origem(versao, posicao=False):
+    # Uma leitura por mês dos arquivos das partições selecionadas. O mês vem
+    # do catálogo: o particionamento Hive do DuckDB não decodifica os nomes
+    # das pastas (ex.: 'Subarea=Especialidades%20M%C3%A9dicas'), então só a
+    # Subarea gravada nos próprios arquivos é usada. Com `posicao`, cada
+    # linha traz o arquivo e a posição nele (filename e file_row_number)
+    por_mes = {}
+    for particao in versao:
+        por_mes.setdefault(particao[1], []).extend(_arquivos([particao]))
+    opcoes = "union_by_name = true, hive_partitioning = false"
+    if posicao:
+        opcoes += ", filename = true, file_row_number = true"
+    leituras = [
+        f"SELECT *, {_literal(mes)} AS {COLUNA_MES} "
+        f"FROM read_parquet([{', '.join(_literal(caminho) for caminho in caminhos)}], {opcoes})"
+        for mes, caminhos in sorted(por_mes.items())
+    ]
+    # As colunas derivadas de enriquecer_dados (utils/dados.py)
+    return (
+        "SELECT *, Quantidade * ValorUnitario AS Receita, CAST(day(dataRealizado) AS TINYINT) AS Dia "
+        f"FROM ({' UNION ALL BY NAME '.join(leituras)})"
+    )
+
+
+# -------------------------- SELEÇÃO DE UMA PÁGINA --------------------------
+class SelecaoDuckDB:
+    """
+    Dados de uma página (meses e subárea, dados pela `versao`, ver
+    utils.dados.versao_dados) consultados com SQL. Tem a mesma interface da
+    seleção em memória (utils.dados.SelecaoMemoria); filtrar() devolve outra
+    seleção, com os filtros, que kpis, agrupar_soma e mapa_calor aceitam no
+    lugar do cubo filtrado.
+    """
+
+    def __init__(self, versao, filtros=None):
+        self.versao = versao
+        self.filtros = dict(filtros or {})
+
+    def _sql(self, colunas, sufixo="", posicao=False):
+        condicoes = " AND ".join(f"{_identificador(coluna)} = ?" for coluna in self.filtros)
+        onde = f" WHERE {condicoes}" if condicoes else ""
+        return f"SELECT {colunas} FROM ({_origem(self.versao, posicao)}){onde} {sufixo}".strip()
+
+    def _consultar(self, colunas, sufixo="", posicao=False):
+        parametros = tuple(str(valor) for valor in self.filtros.values())
+        with consulta_cache('consultas_sql'):
+            return _consultar_em_cache(self.versao, self._sql(colunas, sufixo, posicao), parametros)
+
+    def _colunas_linhas(self):
+        # As colunas das linhas em memória (ver utils.dados.enriquecer_dados)
+        colunas = ler_manifesto(self.versao[0][0])['colunas'] + [COLUNA_MES, 'Receita', 'Dia']
+        return ", ".join(map(_identificador, colunas))
+
+    def _ordem_linhas(self):
+        # A leitura paralela não preserva a ordem; ordena pelo arquivo e pela
+        # posição da linha nele, a ordem das linhas em memória
+        arquivos = ", ".join(_literal(caminho) for caminho in _arquivos(self.versao))
+        return f"ORDER BY list_position([{arquivos}], filename), file_row_number"
+
+    # ----- Interface comum das seleções -----
+    def valores(self, coluna):
+        """
+        Valores distintos da coluna, em ordem.
+        """
+        return sorted(self._consultar(f"DISTINCT {_identificador(coluna)}")[coluna].dropna().tolist())
+
+    def filtrar(self, filtros):
+        """
+        Retorna a seleção restrita aos filtros ({coluna: valor}).
+        """
+        return SelecaoDuckDB(self.versao, {**self.filtros, **filtros})
+
+    def linhas(self, filtros):
+        """
+        Retorna as linhas que atendem aos filtros, com as colunas, os tipos
+        e a ordem das linhas em memória. Não fica em cache: os downloads já
+        ficam.
+        """
+        selecao = self.filtrar(filtros)
+        parametros = tuple(str(valor) for valor in selecao.filtros.values())
+        df = _executar(selecao._sql(self._colunas_linhas(), self._ordem_linhas(), posicao=True), parametros)
+        for coluna in COLUNAS_DIMENSAO + [COLUNA_MES]:
+            df[coluna] = df[coluna].astype('category')
+        df['dataRealizado'] = df['dataRealizado'].astype('datetime64[ns]')
+        return compactar_inteiros(df)
+
+    def amostra(self, linhas=5):
+        """
+        Retorna as primeiras linhas da seleção.
+        """
+        return self._consultar(self._colunas_linhas(), f"{self._ordem_linhas()} LIMIT {int(linhas)}", posicao=True)
+
+    def memoria(self):
+        # As linhas ficam nos Parquets, não em memória
+        return None
+
+    # ----- Consultas do cubo filtrado (ver utils/cubo.py) -----
+    def kpis(self):
+        resultado = self._consultar(
+            "CAST(COALESCE(SUM(Quantidade), 0) AS BIGINT) AS Quantidade, "
+            "COALESCE(SUM(Receita), 0) AS Receita, COUNT(*) AS Atendimentos"
+        )
+        qtd_total = resultado['Quantidade'].iloc[0]
+        rec_total = resultado['Receita'].iloc[0]
+        valor_medio = rec_total / qtd_total if qtd_total > 0 else 0
+        return qtd_total, rec_total, valor_medio, int(resultado['Atendimentos'].iloc[0])
+
+    def agrupar_soma(self, por, colunas):
+        por = [por] if isinstance(por, str) else list(por)
+        colunas = [colunas] if isinstance(colunas, str) else list(colunas)
+        chaves = ", ".join(map(_identificador, por))
+        somas = ", ".join(
+            # Somas inteiras continuam inteiras, como no pandas
+            f"CAST(SUM({_identificador(coluna)}) AS BIGINT) AS {_identificador(coluna)}"
+            if coluna == 'Quantidade' else f"SUM({_identificador(coluna)}) AS {_identificador(coluna)}"
+            for coluna in colunas
+        )
+        resultado = self._consultar(f"{chaves}, {somas}", f"GROUP BY {chaves} ORDER BY {chaves}")
+        for coluna in por:
+            if coluna in COLUNAS_DIMENSAO:
+                resultado[coluna] = resultado[coluna].astype('category')
+        return resultado
+
+    def mapa_calor(self, linhas, colunas, top):
+        linha, coluna = _identificador(linhas), _identificador(colunas)
+        condicao_topo = (
+            f"{linha} IN (SELECT {linha} FROM ({self._sql('*')}) "
+            f"GROUP BY {linha} ORDER BY SUM(Quantidade) DESC LIMIT {int(top)})"
+        )
+        # Os filtros aparecem duas vezes na consulta (seleção e subconsulta)
+        parametros = tuple(str(valor) for valor in self.filtros.values())
+        sql = (
+            f"SELECT {linha}, {coluna}, CAST(SUM(Quantidade) AS BIGINT) AS Quantidade "
+            f"FROM ({self._sql('*')}) WHERE {condicao_topo} GROUP BY {linha}, {coluna}"
+        )
+        with consulta_cache('consultas_sql'):
+            resultado = _consultar_em_cache(self.versao, sql, parametros * 2)
+        if resultado.empty:
+            return pd.DataFrame()
+        return resultado.pivot_table(index=linhas, columns=colunas, values='Quantidade', aggfunc='sum', fill_value=0)
@@ -0,0 +1,72 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import pandas as pd
+
+from utils.instrumentacao import etapa
+
+# Dimensões do cubo: toda combinação de filtros e gráficos dos dashboards é
+# respondida somando células do cubo nessas colunas
+DIMENSOES = ['Mes', 'Subarea', 'Unidade', 'Categoria', 'TipoAtendimento', 'TipoServico', 'NMServico', 'Dia']
+
+# Medidas aditivas guardadas em cada célula
+MEDIDAS = ['Quantidade', 'Receita', 'Atendimentos']
+
+
+# -------------------------- CONSTRUÇÃO --------------------------
+def construir_cubo(df):
+    """
+    Pré-agrega os dados linha a linha em um cubo com a soma de Quantidade e
+    Receita e o número de linhas (Atendimentos) de cada combinação de
+    dimensões presente nos dados.
+    """
+    return df.groupby(DIMENSOES, observed=True).agg(
+        Quantidade=('Quantidade', 'sum'),
+        Receita=('Receita', 'sum'),
+        Atendimentos=('Quantidade', 'size'),
+    ).reset_index()
+
+
+# -------------------------- CONSULTAS --------------------------
+def kpis(cubo):
+    """
+    Retorna (quantidade total, receita total, valor médio, número de
+    atendimentos) de um cubo já filtrado.
+    """
+    with etapa('kpis'):
+        # No backend DuckDB, o "cubo" é a seleção filtrada, respondida com SQL
+        if not isinstance(cubo, pd.DataFrame):
+            return cubo.kpis()
+        qtd_total = cubo['Quantidade'].sum()
+        rec_total = cubo['Receita'].sum()
+        valor_medio = rec_total / qtd_total if qtd_total > 0 else 0
+        num_atendimentos = int(cubo['Atendimentos'].sum())
+    return qtd_total, rec_total, valor_medio, num_atendimentos
+
+
+def mapa_calor(cubo, linhas='Subarea', colunas='TipoAtendimento', top=10):
+    """
+    Tabela de Quantidade por linhas x colunas, limitada às `top` linhas de
+    maior Quantidade. Retorna um DataFrame vazio se não houver dados.
+    """
+    with etapa('agregação'):
+        if not isinstance(cubo, pd.DataFrame):
+            return cubo.mapa_calor(linhas, colunas, top)
+        top_linhas = cubo.groupby(linhas, observed=True)['Quantidade'].sum().nlargest(top).index
+        cubo_top = cubo[cubo[linhas].isin(top_linhas)]
+        if cubo_top.empty:
+            return pd.DataFrame()
+        return cubo_top.pivot_table(
+            index=linhas,
+            columns=colunas,
+            values='Quantidade',
+            aggfunc='sum',
+            fill_value=0,
+            observed=True
+        )
+
+
+def resumir_subareas(df):
+    """
+    Quantidade e Receita totais de cada subárea em cada mês, em uma única
+    agregação.
+    """
+    return df.groupby(['Mes', 'Subarea'], observed=True)[['Quantidade', 'Receita']].sum().reset_index()
@@ -0,0 +1,330 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import glob
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+
+from utils.armazenamento import atualizar_auxiliar, ler_particoes, sincronizar_planilha
+from utils.cubo import construir_cubo, resumir_subareas
+from utils.filtros import IndiceFiltros
+from utils.instrumentacao import etapa
+from utils.metricas import consulta_cache, falta_cache
+
+# Diretório e padrão de nome das planilhas mensais
+DIRETORIO_DADOS = os.environ.get("DASH_DIRETORIO_DADOS", ".")
+PADRAO_PLANILHAS = os.environ.get("DASH_PADRAO_PLANILHAS", "Analise_*.xlsx")
+
+# Seleções (versão dos dados, meses e subárea) cujas linhas, cubo e índices
+# ficam em memória; ao passar desse número, as usadas há mais tempo são
+# descartadas, inclusive as de versões substituídas por uma atualização
+MAXIMO_SELECOES = int(os.environ.get("DASH_MAXIMO_SELECOES", 10))
+
+# Backend das consultas das páginas: 'pandas' (linhas e cubo em memória) ou
+# 'duckdb' (SQL sobre os Parquets, ver utils/consultas_duckdb.py)
+BACKEND = os.environ.get("DASH_BACKEND", "pandas")
+
+
+# -------------------------- ENRIQUECIMENTO --------------------------
+def enriquecer_dados(df):
+    """
+    Adiciona as colunas derivadas usadas pelos dashboards (Receita e Dia)
+    e converte a coluna de data para datetime.
+    """
+    df['Receita'] = df['Quantidade'] * df['ValorUnitario']
+    # Já é datetime quando vem do armazenamento colunar; converter de novo
+    # copiaria a coluna lida sem cópia dos arquivos mapeados
+    if not pd.api.types.is_datetime64_any_dtype(df['dataRealizado']):
+        df['dataRealizado'] = pd.to_datetime(df['dataRealizado'])
+    df['Dia'] = df['dataRealizado'].dt.day.astype('int8')
+    return df
+
+
+# -------------------------- AGRUPAMENTOS --------------------------
+def agrupar_soma(df, por, colunas):
+    """
+    Soma as colunas por grupo, considerando apenas as combinações presentes
+    nos dados. As categorias sem linhas são removidas das chaves, já que o
+    plotly falha ao agrupar por categorias vazias.
+    """
+    with etapa('agregação'):
+        # No backend DuckDB, `df` é a seleção filtrada (utils/consultas_duckdb.py)
+        if not isinstance(df, pd.DataFrame):
+            return df.agrupar_soma(por, colunas)
+        resultado = df.groupby(por, observed=True)[colunas].sum().reset_index()
+        for coluna in ([por] if isinstance(por, str) else por):
+            if isinstance(resultado[coluna].dtype, pd.CategoricalDtype):
+                resultado[coluna] = resultado[coluna].cat.remove_unused_categories()
+    return resultado
+
+
+# -------------------------- USO DE MEMÓRIA --------------------------
+def relatorio_memoria(df):
+    """
+    Compara a memória ocupada pelo DataFrame com a que ocuparia com as
+    dimensões como texto (object) e os inteiros em int64.
+
+    Retorna um dicionário com 'atual', 'sem_compactacao' e 'economia', em bytes.
+    """
+    atual = int(df.memory_usage(deep=True, index=False).sum())
+    sem_compactacao = atual
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # Cada linha guardaria um ponteiro para a string correspondente
+            contagens = serie.value_counts(sort=False)
+            bytes_texto = sum(sys.getsizeof(str(valor)) * n for valor, n in contagens.items())
+            sem_compactacao += 8 * len(serie) + bytes_texto - int(serie.memory_usage(deep=True, index=False))
+        elif pd.api.types.is_integer_dtype(serie.dtype):
+            sem_compactacao += (8 - serie.dtype.itemsize) * len(serie)
+    return {'atual': atual, 'sem_compactacao': sem_compactacao, 'economia': sem_compactacao - atual}
+
+
+# -------------------------- PLANILHAS DISPONÍVEIS --------------------------
+def listar_planilhas(diretorio=DIRETORIO_DADOS, padrao=PADRAO_PLANILHAS):
+    """
+    Retorna, em ordem, as planilhas do diretório de dados que seguem o padrão
+    de nome (por padrão, Analise_*.xlsx no diretório atual).
+    """
+    return sorted(glob.glob(os.path.join(diretorio, padrao)))
+
+
+def assinatura_arquivo(file_path):
+    """
+    Retorna (mtime em ns, tamanho em bytes) do arquivo. Qualquer alteração
+    no arquivo muda a assinatura e, portanto, invalida o cache.
+    """
+    info = os.stat(file_path)
+    return info.st_mtime_ns, info.st_size
+
+
+def versao_planilhas(planilhas):
+    """
+    Chave de cache de um conjunto de planilhas: caminho, mtime e tamanho de
+    cada uma.
+    """
+    return tuple((file_path, *assinatura_arquivo(file_path)) for file_path in planilhas)
+
+
+@st.cache_data(show_spinner="Verificando planilhas...")
+def _montar_catalogo(versao):
+    # Converte para Parquet as planilhas novas ou alteradas (só as partições
+    # que mudaram) e lê dos manifestos as partições de cada uma
+    catalogo = {}
+    for file_path, _, _ in versao:
+        with etapa('sincronização das planilhas'):
+            manifesto = sincronizar_planilha(file_path)
+        for particao in manifesto['particoes'].values():
+            subareas = catalogo.setdefault(particao['mes'], {}).setdefault(file_path, {})
+            subareas[particao['subarea']] = particao['assinatura']
+    return catalogo
+
+
+def carregar_catalogo(planilhas):
+    """
+    Retorna {mês 'AAAA-MM': {planilha: {subárea: assinatura da partição}}},
+    sincronizando antes o armazenamento colunar das planilhas (ver
+    utils/armazenamento.py).
+    """
+    try:
+        return _montar_catalogo(versao_planilhas(planilhas))
+    except Exception as e:
+        st.error(f"Erro ao ler as planilhas: {e}")
+        return {}
+
+
+def versao_dados(planilhas, meses, subarea=None):
+    """
+    Retorna a versão dos dados dos `meses` (e da `subarea`): as assinaturas
+    das partições lidas. Usada como chave de cache, faz com que uma
+    atualização da planilha só invalide os meses e subáreas que mudaram.
+    """
+    catalogo = carregar_catalogo(planilhas)
+    return tuple(sorted(
+        (file_path, mes, nome, assinatura)
+        for mes in meses
+        for file_path, subareas in catalogo.get(mes, {}).items()
+        for nome, assinatura in subareas.items()
+        if subarea is None or nome == subarea
+    ))
+
+
+# -------------------------- LEITURA COM CACHE --------------------------
+# As linhas e o cubo ficam em st.cache_resource: um único objeto por versão,
+# compartilhado por todas as sessões e páginas do processo, em vez da cópia
+# que st.cache_data devolve a cada chamada. Por isso são somente leitura:
+# as páginas filtram por posição (utils/filtros.py) e agregam em novos
+# DataFrames, nunca alteram os compartilhados. Cada cache guarda no máximo
+# MAXIMO_SELECOES entradas.
+@st.cache_resource(show_spinner="Carregando dados...", max_entries=MAXIMO_SELECOES)
+def _ler_dados(versao, meses, subarea=None):
+    planilhas = sorted({file_path for file_path, _, _, _ in versao})
+    if not planilhas:
+        return None
+    with falta_cache('dados'):
+        with etapa('leitura'):
+            df = ler_particoes(planilhas, meses, subarea)
+        with etapa('enriquecimento'):
+            return enriquecer_dados(df)
+
+
+def carregar_dados(planilhas, meses, subarea=None):
+    """
+    Retorna as linhas dos `meses` selecionados, já enriquecidas.
+
+    Só as partições desses meses (e da `subarea`, se informada) são lidas do
+    armazenamento colunar. O resultado é compartilhado por todas as sessões
+    do processo, não deve ser alterado, e só é relido quando alguma dessas
+    partições muda.
+    """
+    try:
+        versao = versao_dados(planilhas, meses, subarea)
+        with consulta_cache('dados'):
+            return _ler_dados(versao, tuple(meses), subarea)
+    except Exception as e:
+        st.error(f"Erro ao ler os dados: {e}")
+        return None
+
+
+@st.cache_resource(show_spinner="Agregando dados...", max_entries=MAXIMO_SELECOES)
+def _montar_cubo(versao, meses, subarea=None):
+    df = _ler_dados(versao, meses, subarea)
+    with falta_cache('cubo'), etapa('cubo'):
+        return construir_cubo(df)
+
+
+def carregar_cubo(planilhas, meses, subarea=None):
+    """
+    Retorna o cubo pré-agregado dos meses selecionados (ver utils/cubo.py),
+    construído uma vez por versão das partições e compartilhado, somente
+    leitura, como as linhas. Com `subarea`, o cubo cobre só ela.
+    """
+    versao = versao_dados(planilhas, meses, subarea)
+    with consulta_cache('cubo'):
+        return _montar_cubo(versao, tuple(meses), subarea)
+
+
+# -------------------------- RESUMO POR SUBÁREA --------------------------
+def atualizar_resumo_subareas(file_path):
+    """
+    Retorna o resumo por mês e subárea da planilha, persistido ao lado do
+    dataset: uma nova sessão ou um novo processo não precisa carregar as
+    linhas para montá-lo, e, quando a planilha muda, só as partições
+    alteradas são reagregadas.
+    """
+    return atualizar_auxiliar(
+        file_path, 'resumo_subareas', lambda df: resumir_subareas(enriquecer_dados(df))
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _resumo_planilha(file_path, mtime_ns, tamanho):
+    return atualizar_resumo_subareas(file_path)
+
+
+def carregar_resumo_subareas(planilhas, meses):
+    """
+    Retorna Quantidade e Receita por subárea nos meses selecionados, usadas
+    nos cards do Home, ou None se as planilhas não puderem ser lidas (o erro
+    é exibido por carregar_catalogo).
+    """
+    try:
+        resumos = [
+            _resumo_planilha(file_path, *assinatura_arquivo(file_path))
+            for file_path in sorted({file_path for file_path, _, _, _ in versao_dados(planilhas, meses)})
+        ]
+    except Exception:
+        return None
+    if not resumos:
+        return None
+    resumo = pd.concat(resumos, ignore_index=True)
+    resumo = resumo[resumo['Mes'].isin(meses)]
+    resumo['Subarea'] = resumo['Subarea'].astype(str)
+    return resumo.groupby('Subarea')[['Quantidade', 'Receita']].sum().reset_index()
+
+
+# -------------------------- ÍNDICES DE FILTROS --------------------------
+@st.cache_resource(show_spinner=False, max_entries=MAXIMO_SELECOES)
+def _montar_indices(versao, meses, subarea=None):
+    df = _ler_dados(versao, meses, subarea)
+    cubo = _montar_cubo(versao, meses, subarea)
+    with etapa('índices'):
+        return IndiceFiltros(df), IndiceFiltros(cubo)
+
+
+def carregar_indices(planilhas, meses, subarea=None):
+    """
+    Retorna os índices de filtros (ver utils/filtros.py) das linhas e do cubo.
+    As posições valem para os DataFrames de carregar_dados e carregar_cubo
+    com os mesmos meses e `subarea`, que não são reordenados: o que cada
+    sessão guarda dos filtros são só essas posições.
+    """
+    return _montar_indices(versao_dados(planilhas, meses, subarea), tuple(meses), subarea)
+
+
+# -------------------------- SELEÇÃO DE UMA PÁGINA --------------------------
+class SelecaoMemoria:
+    """
+    Dados de uma página (meses e subárea) no backend pandas: as linhas, o
+    cubo e os índices compartilhados do processo. filtrar() devolve o cubo
+    filtrado, usado por kpis, agrupar_soma e mapa_calor.
+    """
+
+    def __init__(self, df, cubo, indice_linhas, indice_cubo):
+        self.df = df
+        self.cubo = cubo
+        self.indice_linhas = indice_linhas
+        self.indice_cubo = indice_cubo
+
+    def valores(self, coluna):
+        """
+        Valores distintos da coluna, em ordem.
+        """
+        return sorted(self.cubo[coluna].unique().tolist())
+
+    def filtrar(self, filtros):
+        """
+        Retorna o cubo restrito aos filtros ({coluna: valor}).
+        """
+        return self.indice_cubo.filtrar(self.cubo, filtros)
+
+    def linhas(self, filtros):
+        """
+        Retorna as linhas que atendem aos filtros.
+        """
+        return self.indice_linhas.filtrar(self.df, filtros)
+
+    def amostra(self, linhas=5):
+        """
+        Retorna as primeiras linhas da seleção.
+        """
+        return self.df.head(linhas)
+
+    def memoria(self):
+        return relatorio_memoria(self.df)
+
+
+def carregar_selecao(planilhas, meses, subarea=None):
+    """
+    Retorna os dados dos `meses` (e da `subarea`) no backend configurado em
+    DASH_BACKEND, ou None se não houver dados ou se eles não puderem ser
+    lidos (o erro é exibido). As páginas usam só a interface comum das
+    seleções: valores, filtrar, linhas, amostra e memoria.
+    """
+    if BACKEND == 'duckdb':
+        try:
+            # Dependência opcional, importada só quando o backend é escolhido
+            from utils.consultas_duckdb import SelecaoDuckDB
+        except ImportError as e:
+            st.error(f"Backend DuckDB indisponível: {e}. Instale o pacote duckdb.")
+            return None
+        versao = versao_dados(planilhas, meses, subarea)
+        return SelecaoDuckDB(versao) if versao else None
+
+    df = carregar_dados(planilhas, meses, subarea)
+    if df is None or df.empty:
+        return None
+    return SelecaoMemoria(
+        df, carregar_cubo(planilhas, meses, subarea), *carregar_indices(planilhas, meses, subarea)
+    )
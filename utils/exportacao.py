@@ -0,0 +1,240 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import io
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+import xlsxwriter
+
+from utils.instrumentacao import etapa
+from utils.metricas import consulta_cache, falta_cache
+
+# Linhas convertidas de cada vez na exportação para Excel
+LINHAS_POR_BLOCO = 10_000
+
+# Limite de linhas de dados por aba (o Excel aceita 1.048.576, com o cabeçalho)
+LINHAS_POR_ABA = 1_048_575
+
+# Linhas usadas para estimar a largura das colunas não categóricas
+AMOSTRA_LARGURA = 1_000
+LARGURA_MAXIMA = 60
+
+# Data zero dos números seriais de data do Excel
+DATA_BASE_EXCEL = pd.Timestamp("1899-12-30")
+
+
+# -------------------------- GERAÇÃO DOS ARQUIVOS --------------------------
+def gerar_csv(df):
+    """
+    Retorna o DataFrame em CSV (UTF-8 com BOM, para abrir no Excel).
+    """
+    return df.to_csv(index=False).encode("utf-8-sig")
+
+
+def _valores_excel(serie):
+    # Converte a coluna, de forma vetorizada, nos valores gravados nas
+    # células: datas viram números seriais do Excel, números viram float e
+    # o resto vira texto; valores ausentes viram None (célula em branco)
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        numeros = ((serie - DATA_BASE_EXCEL) / pd.Timedelta(days=1)).to_numpy(dtype='float64')
+    elif pd.api.types.is_numeric_dtype(serie.dtype):
+        numeros = serie.to_numpy(dtype='float64')
+    else:
+        textos = serie.astype(str).to_numpy(dtype=object)
+        textos[serie.isna().to_numpy()] = None
+        return textos.tolist()
+    valores = numeros.astype(object)
+    valores[~np.isfinite(numeros)] = None
+    return valores.tolist()
+
+
+def _largura_coluna(serie, nome):
+    # Largura pelo maior texto: das categorias, nas colunas categóricas, ou
+    # de uma amostra das linhas, nas demais
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        textos = serie.cat.categories.astype(str).to_series()
+    elif pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        return max(len(str(nome)), 19 if (serie.dt.normalize() != serie).any() else 10) + 2
+    else:
+        textos = serie.head(AMOSTRA_LARGURA).astype(str)
+    maior = int(textos.str.len().max()) if len(textos) else 0
+    return min(max(maior, len(str(nome))) + 2, LARGURA_MAXIMA)
+
+
+def _nome_aba(nome, parte):
+    # O Excel limita o nome da aba a 31 caracteres, sem []:*?/\
+    nome = re.sub(r"[\[\]:*?/\\]", "_", str(nome)) or "Dados"
+    sufixo = f" ({parte})" if parte > 1 else ""
+    return nome[:31 - len(sufixo)] + sufixo
+
+
+def gerar_excel(abas):
+    """
+    Retorna uma planilha xlsx com uma aba por item de `abas` ({nome da aba:
+    DataFrame}), com cabeçalho em negrito e a largura das colunas ajustada.
+
+    As linhas são gravadas em blocos no modo de memória constante do
+    xlsxwriter, que descarrega cada linha em disco assim que ela é escrita.
+    DataFrames maiores que o limite de linhas do Excel continuam em abas
+    numeradas ("Dados (2)", ...).
+    """
+    buffer = io.BytesIO()
+    planilha = xlsxwriter.Workbook(buffer, {'constant_memory': True})
+    negrito = planilha.add_format({'bold': True})
+    formato_data = planilha.add_format({'num_format': 'dd/mm/yyyy'})
+    formato_data_hora = planilha.add_format({'num_format': 'dd/mm/yyyy hh:mm:ss'})
+
+    for nome, df in abas.items():
+        # Formato e método de escrita de cada coluna
+        formatos = []
+        escritas = []
+        for coluna in df.columns:
+            serie = df[coluna]
+            if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+                com_hora = (serie.dt.normalize() != serie).any()
+                formatos.append(formato_data_hora if com_hora else formato_data)
+                escritas.append('write_number')
+            elif pd.api.types.is_numeric_dtype(serie.dtype):
+                formatos.append(None)
+                escritas.append('write_number')
+            else:
+                formatos.append(None)
+                escritas.append('write_string')
+        larguras = [_largura_coluna(df[coluna], coluna) for coluna in df.columns]
+
+        for parte, inicio_aba in enumerate(range(0, max(len(df), 1), LINHAS_POR_ABA), start=1):
+            aba = planilha.add_worksheet(_nome_aba(nome, parte))
+            for indice, largura in enumerate(larguras):
+                aba.set_column(indice, indice, largura)
+            aba.write_row(0, 0, [str(coluna) for coluna in df.columns], negrito)
+            aba.freeze_panes(1, 0)
+            metodos = [getattr(aba, escrita) for escrita in escritas]
+
+            fim_aba = min(inicio_aba + LINHAS_POR_ABA, len(df))
+            for inicio in range(inicio_aba, fim_aba, LINHAS_POR_BLOCO):
+                bloco = df.iloc[inicio:min(inicio + LINHAS_POR_BLOCO, fim_aba)]
+                colunas = [_valores_excel(bloco[coluna]) for coluna in df.columns]
+                for linha, valores in enumerate(zip(*colunas), start=inicio - inicio_aba + 1):
+                    for indice, valor in enumerate(valores):
+                        if valor is not None:
+                            metodos[indice](linha, indice, valor, formatos[indice])
+
+    planilha.close()
+    return buffer.getvalue()
+
+
+def gerar_csv_compactado(df, codec):
+    """
+    Retorna o DataFrame em CSV compactado com `codec` ('gzip' ou 'zstd'),
+    convertido e compactado em blocos de linhas.
+    """
+    saida = pa.BufferOutputStream()
+    with pa.CompressedOutputStream(saida, codec) as compactado:
+        for inicio in range(0, max(len(df), 1), LINHAS_POR_BLOCO):
+            bloco = df.iloc[inicio:inicio + LINHAS_POR_BLOCO]
+            # BOM e cabeçalho só no primeiro bloco
+            texto = bloco.to_csv(index=False, header=inicio == 0)
+            compactado.write(texto.encode("utf-8-sig" if inicio == 0 else "utf-8"))
+    return saida.getvalue().to_pybytes()
+
+
+def gerar_parquet(df):
+    """
+    Retorna o DataFrame em Parquet (compactado com zstd), preservando os
+    tipos das colunas, inclusive as categóricas.
+    """
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer, compression='zstd')
+    return buffer.getvalue()
+
+
+def gerar_zip_subareas(df):
+    """
+    Retorna um ZIP com um CSV por subárea presente no DataFrame.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as arquivo_zip:
+        for subarea, parte in df.groupby('Subarea', observed=True):
+            nome = re.sub(r"[\\/:*?\"<>|]", "_", str(subarea))
+            arquivo_zip.writestr(f"{nome}.csv", gerar_csv(parte))
+    return buffer.getvalue()
+
+
+# Formatos de download: rótulo, extensão e tipo MIME
+FORMATOS = {
+    'csv': ("CSV", "csv", "text/csv"),
+    'excel': ("Excel", "xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    'csv_gzip': ("CSV (gzip)", "csv.gz", "application/gzip"),
+    'csv_zstd': ("CSV (zstd)", "csv.zst", "application/zstd"),
+    'parquet': ("Parquet", "parquet", "application/vnd.apache.parquet"),
+    'zip_subareas': ("ZIP por subárea", "zip", "application/zip"),
+}
+
+# Formatos exibidos nas páginas de uma única subárea
+FORMATOS_SUBAREA = ('csv', 'excel', 'csv_gzip', 'csv_zstd', 'parquet')
+
+# Botões de download por linha
+BOTOES_POR_LINHA = 3
+
+
+def gerar_formato(df, formato, aba):
+    """
+    Retorna o DataFrame no `formato` (chave de FORMATOS); `aba` é o nome da
+    aba no Excel.
+    """
+    if formato == 'csv':
+        return gerar_csv(df)
+    if formato == 'excel':
+        return gerar_excel({aba: df})
+    if formato == 'csv_gzip':
+        return gerar_csv_compactado(df, 'gzip')
+    if formato == 'csv_zstd':
+        return gerar_csv_compactado(df, 'zstd')
+    if formato == 'parquet':
+        return gerar_parquet(df)
+    return gerar_zip_subareas(df)
+
+
+@st.cache_data(show_spinner="Gerando arquivo...", max_entries=32)
+def _gerar_arquivo(chave, formato, aba, _obter_dados):
+    # `chave` identifica os dados (versão + filtros); `_obter_dados` não
+    # entra no hash do cache e só é chamada quando o arquivo não está nele
+    with falta_cache('exportacoes'), etapa(f"exportação {formato}"):
+        return gerar_formato(_obter_dados(), formato, aba)
+
+
+# -------------------------- BOTÕES DE DOWNLOAD --------------------------
+def botoes_download(versao, filtros, obter_dados, nome_arquivo, aba, formatos=tuple(FORMATOS)):
+    """
+    Exibe um botão "Gerar" por formato; depois de clicado, ele dá lugar ao
+    botão de download do arquivo, que continua disponível enquanto os
+    filtros não mudarem.
+
+    Os arquivos só são gerados quando pedidos e ficam em cache por `versao`
+    dos dados (ver utils.dados.versao_dados) e `filtros`, então outros
+    usuários com a mesma seleção recebem o arquivo pronto. `obter_dados`
+    retorna as linhas filtradas e só é chamada na geração. `formatos` são
+    chaves de FORMATOS.
+    """
+    chave = (versao, tuple(sorted(filtros.items())))
+    colunas = []
+    for posicao, formato in enumerate(formatos):
+        if posicao % BOTOES_POR_LINHA == 0:
+            colunas = st.columns(BOTOES_POR_LINHA)
+        coluna = colunas[posicao % BOTOES_POR_LINHA]
+        rotulo, extensao, mime = FORMATOS[formato]
+        # O botão de download substitui o de geração no mesmo espaço
+        area = coluna.empty()
+        # Guarda na sessão para qual seleção o arquivo já foi pedido
+        estado = f"download_{nome_arquivo}_{formato}"
+        if st.session_state.get(estado) != chave:
+            if area.button(f"Gerar {rotulo}", key=f"gerar_{estado}"):
+                st.session_state[estado] = chave
+        if st.session_state.get(estado) == chave:
+            with consulta_cache('exportacoes'):
+                dados = _gerar_arquivo(chave, formato, aba, obter_dados)
+            area.download_button(f"Download {rotulo}", dados, f"{nome_arquivo}.{extensao}", mime)
@@ -0,0 +1,67 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import numpy as np
+import pandas as pd
+
+from utils.instrumentacao import etapa
+
+# Colunas que aparecem como filtros na barra lateral
+COLUNAS_FILTRO = ['Unidade', 'Categoria', 'Subarea', 'TipoAtendimento', 'TipoServico']
+
+
+# -------------------------- ÍNDICE DE FILTROS --------------------------
+class IndiceFiltros:
+    """
+    Índice invertido das colunas filtráveis de um DataFrame: para cada valor
+    de cada coluna guarda as posições (ordenadas) das linhas com esse valor.
+
+    Aplicar filtros vira uma interseção de vetores de posições, sem máscaras
+    booleanas sobre o DataFrame inteiro e sem cópias intermediárias.
+    """
+
+    def __init__(self, df, colunas=COLUNAS_FILTRO):
+        self.tamanho = len(df)
+        self._posicoes = {}
+        for coluna in colunas:
+            codigos, valores = pd.factorize(df[coluna], sort=True)
+            # A ordenação estável mantém as posições de cada valor crescentes
+            ordem = np.argsort(codigos, kind='stable')
+            limites = np.searchsorted(codigos[ordem], np.arange(len(valores) + 1))
+            self._posicoes[coluna] = {
+                valor: ordem[limites[i]:limites[i + 1]]
+                for i, valor in enumerate(valores)
+            }
+
+    def valores(self, coluna):
+        """
+        Valores distintos da coluna, em ordem.
+        """
+        return list(self._posicoes[coluna])
+
+    def selecionar(self, filtros):
+        """
+        Retorna as posições (ordenadas) das linhas que atendem a todos os
+        filtros ({coluna: valor}).
+        """
+        if not filtros:
+            return np.arange(self.tamanho)
+
+        vazio = np.empty(0, dtype=np.intp)
+        listas = [self._posicoes[coluna].get(valor, vazio) for coluna, valor in filtros.items()]
+        # Começa pela lista mais curta para que cada interseção seja barata
+        listas.sort(key=len)
+        posicoes = listas[0]
+        for outras in listas[1:]:
+            if len(posicoes) == 0:
+                break
+            posicoes = np.intersect1d(posicoes, outras, assume_unique=True)
+        return posicoes
+
+    def filtrar(self, df, filtros):
+        """
+        Retorna as linhas de df que atendem aos filtros. Sem filtros, devolve
+        o próprio df, sem cópia.
+        """
+        if not filtros:
+            return df
+        with etapa('filtragem'):
+            return df.iloc[self.selecionar(filtros)]
@@ -0,0 +1,50 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import pandas as pd
+
+from utils.instrumentacao import etapa
+
+# -------------------------- FORMATAÇÃO NO PADRÃO BRASILEIRO --------------------------
+# Os separadores são trocados diretamente no texto formatado (1,234.56 ->
+# 1.234,56), sem locale.setlocale: o locale é global ao processo e não é
+# seguro alterá-lo com várias sessões rodando em threads.
+_TROCA_SEPARADORES = str.maketrans({',': '.', '.': ','})
+
+
+# Função para formatar valores monetários no padrão brasileiro
+def formatar_moeda(valor):
+    return "R$ " + f"{valor:,.2f}".translate(_TROCA_SEPARADORES)
+
+
+# Função para formatar números inteiros com separador de milhar
+def formatar_numero(valor):
+    return f"{valor:,}".translate(_TROCA_SEPARADORES)
+
+
+# Função para formatar percentuais
+def formatar_percentual(valor):
+    return f"{valor:.2f}%".translate(_TROCA_SEPARADORES)
+
+
+# -------------------------- FORMATAÇÃO DE COLUNAS --------------------------
+def _trocar_separadores(serie, textos):
+    # Troca os separadores de todos os textos de uma vez, em uma única
+    # string, em vez de uma chamada por célula
+    trocados = "\n".join(textos).translate(_TROCA_SEPARADORES).split("\n")
+    return pd.Series(trocados, index=serie.index, name=serie.name)
+
+
+def formatar_moeda_coluna(serie):
+    """
+    Formata uma coluna inteira como moeda ('R$ 1.234,56').
+    """
+    with etapa('formatação'):
+        return "R$ " + _trocar_separadores(serie, map("{:,.2f}".format, serie.tolist()))
+
+
+def formatar_numero_coluna(serie):
+    """
+    Formata uma coluna inteira como número inteiro com separador de milhar
+    ('1.234'); valores fracionários são truncados, como em int().
+    """
+    with etapa('formatação'):
+        return _trocar_separadores(serie, map("{:,}".format, serie.astype('int64').tolist()))
@@ -0,0 +1,82 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import os
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+from utils.instrumentacao import etapa
+from utils.metricas import CONSULTAS_CACHE
+
+# Máximo de figuras mantidas em cache no processo
+MAXIMO_FIGURAS = int(os.environ.get("DASH_MAXIMO_FIGURAS", 256))
+
+
+# -------------------------- CACHE DE FIGURAS --------------------------
+class CacheFiguras:
+    """
+    Cache LRU de figuras do plotly, compartilhado entre as sessões do
+    processo. Ao passar de `maximo` figuras, as usadas há mais tempo são
+    descartadas.
+
+    As figuras guardadas não devem ser alteradas depois de construídas, já
+    que a mesma instância é exibida em todas as sessões.
+    """
+
+    def __init__(self, maximo=MAXIMO_FIGURAS):
+        self.maximo = maximo
+        self._figuras = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave, construir):
+        with self._trava:
+            if chave in self._figuras:
+                self._figuras.move_to_end(chave)
+                self.acertos += 1
+                CONSULTAS_CACHE.incrementar(cache='figuras', resultado='acerto')
+                return self._figuras[chave]
+            self.faltas += 1
+        CONSULTAS_CACHE.incrementar(cache='figuras', resultado='falta')
+
+        # A construção acontece fora da trava, para não bloquear as outras
+        # sessões; se duas construírem a mesma figura, fica a última
+        figura = construir()
+        with self._trava:
+            self._figuras[chave] = figura
+            self._figuras.move_to_end(chave)
+            while len(self._figuras) > self.maximo:
+                self._figuras.popitem(last=False)
+        return figura
+
+    def __len__(self):
+        return len(self._figuras)
+
+
+@st.cache_resource(show_spinner=False)
+def cache_figuras():
+    """
+    Retorna o cache de figuras do processo.
+    """
+    return CacheFiguras()
+
+
+def montar_chave_graficos(versao, pagina, filtros):
+    """
+    Monta a parte comum da chave dos gráficos de uma página: versão dos
+    dados (ver utils.dados.versao_dados), página e filtros ativos.
+    """
+    return (versao, pagina, tuple(sorted(filtros.items())))
+
+
+def figura_em_cache(chave, id_grafico, construir):
+    """
+    Retorna a figura `id_grafico` da página para a `chave` (ver
+    montar_chave_graficos). `construir` faz a agregação e monta a figura, e só é
+    chamada quando ela não está no cache.
+    """
+    # Na depuração, o tempo próprio da etapa é o da montagem da figura; a
+    # agregação aparece como etapa interna
+    with etapa(id_grafico):
+        return cache_figuras().obter((chave, id_grafico), construir)
@@ -0,0 +1,110 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.armazenamento import DIRETORIO_CACHE, converter_para_parquet, sincronizar_arrow, sincronizar_planilha
+from utils.dados import atualizar_resumo_subareas, listar_planilhas
+
+
+# -------------------------- INGESTÃO DE UMA PLANILHA --------------------------
+def ingerir_planilha(file_path, completo=False):
+    """
+    Converte uma planilha para o armazenamento colunar (incrementalmente,
+    salvo com `completo`), grava os arquivos Arrow mapeados em memória
+    pelos dashboards e atualiza o resumo por subárea.
+
+    Retorna um dicionário com a planilha, o tempo gasto em segundos, as
+    linhas e os meses encontrados e, em caso de falha, a mensagem de erro.
+    Executada em um processo separado, então erros nunca são propagados.
+    """
+    inicio = time.perf_counter()
+    resultado = {'planilha': file_path, 'linhas': 0, 'meses': [], 'erro': None}
+    try:
+        if completo:
+            manifesto = converter_para_parquet(file_path)
+            sincronizar_arrow(file_path, manifesto)
+        else:
+            manifesto = sincronizar_planilha(file_path)
+        atualizar_resumo_subareas(file_path)
+        resultado['linhas'] = manifesto['linhas']
+        resultado['meses'] = manifesto['meses']
+    except Exception as e:
+        resultado['erro'] = f"{type(e).__name__}: {e}"
+    resultado['segundos'] = time.perf_counter() - inicio
+    return resultado
+
+
+# -------------------------- INGESTÃO EM PARALELO --------------------------
+def ingerir_planilhas(planilhas, processos=None, completo=False, ao_concluir=None):
+    """
+    Ingere as planilhas em paralelo, uma por processo (até `processos`, por
+    padrão o número de núcleos). Cada planilha gera seu próprio dataset em
+    DIRETORIO_CACHE, e os dashboards leem a união deles como um único
+    armazenamento, então o tempo total fica próximo ao da maior planilha.
+
+    `ao_concluir`, se informado, é chamado com o resultado de cada planilha
+    assim que ela termina. Retorna os resultados na ordem de `planilhas`.
+    """
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {
+            executor.submit(ingerir_planilha, file_path, completo): file_path
+            for file_path in planilhas
+        }
+        for futuro in as_completed(futuros):
+            try:
+                resultado = futuro.result()
+            except Exception as e:
+                # O processo morreu (ex.: falta de memória) antes de responder
+                resultado = {'planilha': futuros[futuro], 'linhas': 0, 'meses': [],
+                             'erro': f"{type(e).__name__}: {e}", 'segundos': float('nan')}
+            resultados[resultado['planilha']] = resultado
+            if ao_concluir is not None:
+                ao_concluir(resultado)
+    return [resultados[file_path] for file_path in planilhas]
+
+
+def _exibir_resultado(resultado):
+    nome = os.path.basename(resultado['planilha'])
+    if resultado['erro']:
+        print(f"  ERRO  {nome} ({resultado['segundos']:.1f} s): {resultado['erro']}", flush=True)
+    else:
+        meses = ", ".join(resultado['meses'])
+        print(f"  ok    {nome} ({resultado['segundos']:.1f} s): {resultado['linhas']} linhas [{meses}]", flush=True)
+
+
+# -------------------------- LINHA DE COMANDO --------------------------
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Converte as planilhas mensais para o armazenamento colunar usado pelos dashboards."
+    )
+    parser.add_argument("planilhas", nargs="*",
+                        help="planilhas a ingerir (padrão: todas do diretório de dados)")
+    parser.add_argument("-p", "--processos", type=int, default=None,
+                        help="número de processos em paralelo (padrão: número de núcleos)")
+    parser.add_argument("--completo", action="store_true",
+                        help="regrava todas as partições, em vez de só as alteradas")
+    args = parser.parse_args(argumentos)
+
+    planilhas = args.planilhas or listar_planilhas()
+    if not planilhas:
+        print("Nenhuma planilha encontrada.", file=sys.stderr)
+        return 1
+
+    print(f"Ingerindo {len(planilhas)} planilha(s) em {DIRETORIO_CACHE}...", flush=True)
+    inicio = time.perf_counter()
+    resultados = ingerir_planilhas(planilhas, args.processos, args.completo, _exibir_resultado)
+    total = time.perf_counter() - inicio
+
+    falhas = [resultado for resultado in resultados if resultado['erro']]
+    soma = sum(resultado['segundos'] for resultado in resultados)
+    print(f"Concluído em {total:.1f} s (soma dos tempos por planilha: {soma:.1f} s); "
+          f"{len(resultados) - len(falhas)} ok, {len(falhas)} com falha.")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from utils.metricas import iniciar_servidor, registrar_execucao
+
+# Modo de depuração: ligado para todos com DASH_DEPURACAO=1, ou por sessão
+# com ?depurar=1 na URL
+DEPURACAO = os.environ.get("DASH_DEPURACAO", "") == "1"
+PARAMETRO_DEPURACAO = "depurar"
+
+# Arquivo (JSON lines) com os tempos de cada execução medida
+ARQUIVO_TEMPOS = os.environ.get("DASH_ARQUIVO_TEMPOS", "tempos.jsonl")
+
+# Perfis (cProfile) de execuções isoladas, pedidos pelo administrador: o
+# token em DASH_TOKEN_ADMIN, informado como ?admin=<token> na URL, libera o
+# painel que grava e lista os perfis. Sem o token configurado, o painel não
+# aparece.
+TOKEN_ADMIN = os.environ.get("DASH_TOKEN_ADMIN", "")
+PARAMETRO_ADMIN = "admin"
+DIRETORIO_PERFIS = os.environ.get("DASH_DIRETORIO_PERFIS", "perfis")
+MAXIMO_PERFIS = int(os.environ.get("DASH_MAXIMO_PERFIS", "20"))
+CHAVE_PERFILAR = "_perfilar_proxima_execucao"
+
+# Separador das etapas aninhadas (ex.: 'fig1 › agregação')
+SEPARADOR = " › "
+
+# Cada execução de página roda em uma thread própria; a medição em curso
+# fica nela, para que as funções de utils/ registrem suas etapas sem
+# recebê-la como argumento
+_local = threading.local()
+_trava_arquivo = threading.Lock()
+_SEM_MEDICAO = nullcontext()
+
+
+# -------------------------- MEDIÇÃO DE UMA EXECUÇÃO --------------------------
+class Medicao:
+    """
+    Tempos das etapas de uma execução da página. Etapas podem ser aninhadas
+    e repetidas; cada uma acumula o tempo total, o tempo próprio (sem as
+    etapas internas) e o número de vezes.
+    """
+
+    def __init__(self, pagina, exibir_tempos=True):
+        self.pagina = pagina
+        self.exibir_tempos = exibir_tempos
+        self.perfil = None
+        self.contexto = {}
+        self.etapas = {}
+        self._pilha = []
+        self._inicio = time.perf_counter()
+
+    @contextmanager
+    def etapa(self, nome):
+        self._pilha.append(nome)
+        caminho = SEPARADOR.join(self._pilha)
+        registro = self.etapas.setdefault(caminho, {'segundos': 0.0, 'internas': 0.0, 'vezes': 0})
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            segundos = time.perf_counter() - inicio
+            self._pilha.pop()
+            registro['segundos'] += segundos
+            registro['vezes'] += 1
+            if self._pilha:
+                self.etapas[SEPARADOR.join(self._pilha)]['internas'] += segundos
+
+    def resultado(self):
+        """
+        Retorna a execução como dicionário: página, contexto, total e etapas
+        (em segundos).
+        """
+        return {
+            'data': datetime.now().isoformat(timespec='milliseconds'),
+            'pagina': self.pagina,
+            'contexto': self.contexto,
+            'total': time.perf_counter() - self._inicio,
+            'etapas': [
+                {'etapa': caminho, 'vezes': registro['vezes'], 'segundos': registro['segundos'],
+                 'proprio': registro['segundos'] - registro['internas']}
+                for caminho, registro in self.etapas.items()
+            ],
+        }
+
+
+# -------------------------- INTERFACE DAS PÁGINAS --------------------------
+def depuracao_ativa():
+    """
+    Indica se a execução atual deve ser medida: DASH_DEPURACAO=1 ou o
+    parâmetro ?depurar=1 na URL da sessão.
+    """
+    return DEPURACAO or st.query_params.get(PARAMETRO_DEPURACAO) == "1"
+
+
+def iniciar_medicao(pagina):
+    """
+    Começa a medir a execução da `pagina`, se a depuração estiver ativa ou
+    se o administrador pediu o perfil desta execução; a duração total vai
+    sempre para as métricas. Chamada no início de cada página, depois de
+    st.set_page_config.
+    """
+    iniciar_servidor()
+    _local.execucao = (pagina, time.perf_counter())
+    depuracao = depuracao_ativa()
+    perfilar = st.session_state.pop(CHAVE_PERFILAR, False) and admin_ativo()
+    _local.medicao = Medicao(pagina, depuracao) if depuracao or perfilar else None
+    if perfilar:
+        # cProfile acompanha só a thread atual, a da execução desta sessão
+        _local.medicao.perfil = cProfile.Profile()
+        _local.medicao.perfil.enable()
+
+
+def etapa(nome):
+    """
+    Context manager que mede uma etapa da execução atual; sem medição em
+    curso, não faz nada.
+    """
+    medicao = getattr(_local, 'medicao', None)
+    return _SEM_MEDICAO if medicao is None else medicao.etapa(nome)
+
+
+def anotar(**dados):
+    """
+    Registra dados da execução atual (ex.: meses e filtros) junto dos tempos.
+    """
+    medicao = getattr(_local, 'medicao', None)
+    if medicao is not None:
+        medicao.contexto.update(dados)
+
+
+def finalizar_medicao():
+    """
+    Encerra a medição da execução: grava o perfil, se pedido, exibe os
+    tempos em um painel na barra lateral e acrescenta uma linha JSON em
+    ARQUIVO_TEMPOS. Para o administrador, exibe também o painel de perfis.
+    Chamada no fim de cada página.
+    """
+    medicao = getattr(_local, 'medicao', None)
+    _local.medicao = None
+    execucao = getattr(_local, 'execucao', None)
+    _local.execucao = None
+    # A duração vai para as métricas (utils/metricas.py), exceto a das
+    # execuções perfiladas, que o cProfile torna mais lentas
+    if execucao is not None and (medicao is None or medicao.perfil is None):
+        pagina, inicio = execucao
+        registrar_execucao(pagina, time.perf_counter() - inicio)
+    if medicao is not None:
+        if medicao.perfil is not None:
+            medicao.perfil.disable()
+        resultado = medicao.resultado()
+        if medicao.perfil is not None:
+            nome = gravar_perfil(medicao.perfil, resultado)
+            st.sidebar.success(f"Perfil gravado: {nome}")
+        if medicao.exibir_tempos:
+            _exibir_tempos(resultado)
+
+    if admin_ativo():
+        painel_perfis()
+
+
+def _exibir_tempos(resultado):
+    with st.sidebar.expander("⏱️ Tempos desta execução", expanded=True):
+        st.caption(f"Total: {resultado['total'] * 1000:.1f} ms".replace('.', ','))
+        tabela = pd.DataFrame([
+            {'Etapa': item['etapa'], 'Vezes': item['vezes'],
+             'Total (ms)': item['segundos'] * 1000, 'Próprio (ms)': item['proprio'] * 1000}
+            for item in resultado['etapas']
+        ])
+        st.dataframe(tabela, hide_index=True, use_container_width=True)
+
+    linha = json.dumps(resultado, ensure_ascii=False, default=str)
+    with _trava_arquivo:
+        with open(ARQUIVO_TEMPOS, "a", encoding="utf-8") as arquivo:
+            arquivo.write(linha + "\n")
+
+
+# -------------------------- PERFIS DE EXECUÇÃO --------------------------
+def admin_ativo():
+    """
+    Indica se a sessão é do administrador: DASH_TOKEN_ADMIN configurado e
+    igual ao parâmetro ?admin= da URL.
+    """
+    if not TOKEN_ADMIN:
+        return False
+    # Compara bytes: com str, compare_digest rejeita caracteres não ASCII
+    valor = st.query_params.get(PARAMETRO_ADMIN, "")
+    return hmac.compare_digest(valor.encode("utf-8"), TOKEN_ADMIN.encode("utf-8"))
+
+
+def gravar_perfil(perfil, resultado):
+    """
+    Grava o perfil da execução em DIRETORIO_PERFIS como <data>_<página>.prof
+    (formato do pstats, aberto por snakeviz, gprof2dot etc.), junto de um
+    .json com a página, os meses, os filtros e os tempos das etapas. Mantém
+    só os MAXIMO_PERFIS mais recentes. Retorna o nome do arquivo .prof.
+    """
+    os.makedirs(DIRETORIO_PERFIS, exist_ok=True)
+    data = datetime.now()
+    pagina = re.sub(r"\W+", "_", resultado['pagina']).strip("_")
+    base = f"{data:%Y%m%d-%H%M%S-%f}_{pagina}"
+    perfil.dump_stats(os.path.join(DIRETORIO_PERFIS, base + ".prof"))
+    with open(os.path.join(DIRETORIO_PERFIS, base + ".json"), "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, default=str, indent=2)
+
+    for antigo in listar_perfis()[MAXIMO_PERFIS:]:
+        for extensao in (".prof", ".json"):
+            try:
+                os.remove(os.path.join(DIRETORIO_PERFIS, antigo['base'] + extensao))
+            except OSError:
+                pass
+    return base + ".prof"
+
+
+def listar_perfis():
+    """
+    Retorna os perfis gravados, do mais recente ao mais antigo, como os
+    dicionários dos .json acrescidos de 'base' (nome sem extensão).
+    """
+    if not os.path.isdir(DIRETORIO_PERFIS):
+        return []
+    perfis = []
+    for nome in sorted(os.listdir(DIRETORIO_PERFIS), reverse=True):
+        base, extensao = os.path.splitext(nome)
+        if extensao != ".json" or not os.path.exists(os.path.join(DIRETORIO_PERFIS, base + ".prof")):
+            continue
+        try:
+            with open(os.path.join(DIRETORIO_PERFIS, nome), encoding="utf-8") as arquivo:
+                perfis.append({**json.load(arquivo), 'base': base})
+        except (OSError, ValueError):
+            continue
+    return perfis
+
+
+def resumo_perfil(caminho, linhas=25):
+    """
+    Retorna as `linhas` funções de maior tempo acumulado do perfil, em texto.
+    """
+    saida = io.StringIO()
+    pstats.Stats(caminho, stream=saida).sort_stats("cumulative").print_stats(linhas)
+    return saida.getvalue()
+
+
+def painel_perfis():
+    """
+    Painel do administrador na barra lateral: pede o perfil de uma nova
+    execução (com os filtros atuais) e lista os perfis recentes para
+    consulta e download.
+    """
+    with st.sidebar.expander("🔬 Perfis de execução"):
+        # O callback roda antes da nova execução, que já é a perfilada
+        st.button("Perfilar esta página", key="perfilar_pagina", use_container_width=True,
+                  help="Executa a página de novo, com os filtros atuais, sob o cProfile",
+                  on_click=st.session_state.__setitem__, args=(CHAVE_PERFILAR, True))
+
+        perfis = listar_perfis()
+        if not perfis:
+            st.caption("Nenhum perfil gravado.")
+            return
+
+        rotulos = [
+            f"{perfil['data'][:19].replace('T', ' ')} · {perfil['pagina']} · {perfil['total'] * 1000:.0f} ms"
+            for perfil in perfis
+        ]
+        escolhido = st.selectbox("Perfis recentes", rotulos, key="perfil_escolhido")
+        perfil = perfis[rotulos.index(escolhido)]
+        contexto = perfil.get('contexto', {})
+        st.caption(f"Meses: {contexto.get('meses')} · Filtros: {contexto.get('filtros')}")
+
+        caminho = os.path.join(DIRETORIO_PERFIS, perfil['base'] + ".prof")
+        try:
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+        except OSError:
+            st.caption("Perfil removido.")
+            return
+        st.download_button("Baixar .prof", conteudo, file_name=perfil['base'] + ".prof",
+                           mime="application/octet-stream", key="baixar_perfil", use_container_width=True)
+        st.code(resumo_perfil(caminho), language=None)
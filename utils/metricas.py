@@ -0,0 +1,247 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import bisect
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Métricas no formato texto do Prometheus, servidas em
+# http://<DASH_ENDERECO_METRICAS>:<DASH_PORTA_METRICAS>/metrics por um
+# servidor HTTP próprio, em uma thread do processo do Streamlit. Sem
+# DASH_PORTA_METRICAS, o servidor não é iniciado (as métricas continuam
+# sendo contadas, a custo desprezível).
+PORTA_METRICAS = os.environ.get("DASH_PORTA_METRICAS", "")
+ENDERECO_METRICAS = os.environ.get("DASH_ENDERECO_METRICAS", "127.0.0.1")
+CAMINHO_METRICAS = "/metrics"
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (em segundos) das faixas dos histogramas
+LIMITES_EXECUCAO = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LIMITES_GERACAO = (0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+# -------------------------- TIPOS DE MÉTRICA --------------------------
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _rotulos(nomes, valores, extra=()):
+    pares = list(zip(nomes, valores)) + list(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in pares) + "}"
+
+
+def _numero(valor):
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+class Contador:
+    """
+    Contador do Prometheus, com uma série por combinação de `rotulos`.
+    """
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def incrementar(self, valor=1, **rotulos):
+        chave = tuple(rotulos[nome] for nome in self.rotulos)
+        with self._trava:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def exportar(self):
+        with self._trava:
+            series = sorted(self._series.items())
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} counter"]
+        for chave, valor in series:
+            linhas.append(f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valor)}")
+        return linhas
+
+
+class Histograma:
+    """
+    Histograma do Prometheus com faixas cumulativas até cada limite de
+    `limites`, uma série por combinação de `rotulos`.
+    """
+
+    def __init__(self, nome, ajuda, limites, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.limites = tuple(limites)
+        self.rotulos = tuple(rotulos)
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def observar(self, valor, **rotulos):
+        chave = tuple(rotulos[nome] for nome in self.rotulos)
+        faixa = bisect.bisect_left(self.limites, valor)
+        with self._trava:
+            serie = self._series.setdefault(chave, {'faixas': [0] * (len(self.limites) + 1), 'soma': 0.0})
+            serie['faixas'][faixa] += 1
+            serie['soma'] += valor
+
+    def exportar(self):
+        with self._trava:
+            series = sorted((chave, list(serie['faixas']), serie['soma']) for chave, serie in self._series.items())
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} histogram"]
+        for chave, faixas, soma in series:
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + ("+Inf",), faixas):
+                acumulado += quantidade
+                le = limite if limite == "+Inf" else _numero(limite)
+                linhas.append(f"{self.nome}_bucket{_rotulos(self.rotulos, chave, [('le', le)])} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}")
+        return linhas
+
+
+# -------------------------- MÉTRICAS DO DASHBOARD --------------------------
+# Caches: 'dados' (linhas lidas do armazenamento colunar), 'cubo' e
+# 'figuras' (agregações) e 'exportacoes' (arquivos de download). A geração
+# do cache 'dados' é a carga das linhas: o _count dela conta as cargas.
+CONSULTAS_CACHE = Contador(
+    "dash_cache_consultas_total", "Consultas aos caches, por resultado (acerto ou falta).", ("cache", "resultado")
+)
+GERACAO_CACHE = Histograma(
+    "dash_cache_geracao_segundos", "Tempo para gerar o conteúdo de um cache na falta (cache=\"dados\": carga das linhas).",
+    LIMITES_GERACAO, ("cache",)
+)
+EXECUCOES = Histograma(
+    "dash_execucao_segundos", "Duração das execuções (reruns) de cada página.", LIMITES_EXECUCAO, ("pagina",)
+)
+
+# Faltas registradas por cache em cada thread, para que consulta_cache
+# saiba se a chamada em curso gerou o conteúdo ou o encontrou pronto
+_local = threading.local()
+
+
+def _faltas_da_thread(cache):
+    return getattr(_local, 'faltas', {}).get(cache, 0)
+
+
+@contextmanager
+def consulta_cache(cache):
+    """
+    Envolve a chamada a uma função em cache: conta um acerto se a função
+    não foi executada (ver falta_cache) durante a chamada.
+    """
+    antes = _faltas_da_thread(cache)
+    yield
+    if _faltas_da_thread(cache) == antes:
+        CONSULTAS_CACHE.incrementar(cache=cache, resultado='acerto')
+
+
+@contextmanager
+def falta_cache(cache):
+    """
+    Envolve o corpo de uma função em cache, que só roda na falta: conta a
+    falta e mede o tempo de geração.
+    """
+    if not hasattr(_local, 'faltas'):
+        _local.faltas = {}
+    _local.faltas[cache] = _local.faltas.get(cache, 0) + 1
+    CONSULTAS_CACHE.incrementar(cache=cache, resultado='falta')
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        GERACAO_CACHE.observar(time.perf_counter() - inicio, cache=cache)
+
+
+def registrar_execucao(pagina, segundos):
+    """
+    Registra a duração de uma execução da `pagina`.
+    """
+    EXECUCOES.observar(segundos, pagina=pagina)
+
+
+def memoria_residente(pid="self"):
+    """
+    Retorna a memória residente (RSS) do processo em bytes, ou None se não
+    puder ser lida (só disponível no Linux).
+    """
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as arquivo:
+            for linha in arquivo:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def sessoes_ativas():
+    """
+    Retorna o número de sessões conectadas ao servidor do Streamlit, ou None
+    fora dele.
+    """
+    try:
+        from streamlit.runtime import Runtime
+        return Runtime.instance()._session_mgr.num_active_sessions()
+    except Exception:
+        return None
+
+
+def exportar_metricas():
+    """
+    Retorna todas as métricas no formato texto do Prometheus.
+    """
+    linhas = CONSULTAS_CACHE.exportar() + GERACAO_CACHE.exportar() + EXECUCOES.exportar()
+    medidas = (
+        ("dash_sessoes_ativas", "Sessões conectadas ao servidor do Streamlit.", sessoes_ativas()),
+        ("dash_memoria_residente_bytes", "Memória residente (RSS) do processo.", memoria_residente()),
+    )
+    for nome, ajuda, valor in medidas:
+        if valor is not None:
+            linhas += [f"# HELP {nome} {ajuda}", f"# TYPE {nome} gauge", f"{nome} {valor}"]
+    return "\n".join(linhas) + "\n"
+
+
+# -------------------------- SERVIDOR HTTP --------------------------
+class _Requisicao(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != CAMINHO_METRICAS:
+            self.send_error(404)
+            return
+        corpo = exportar_metricas().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", TIPO_CONTEUDO)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        # Sem uma linha no terminal do Streamlit a cada coleta
+        pass
+
+
+_servidor = None
+_trava_servidor = threading.Lock()
+
+
+def iniciar_servidor():
+    """
+    Inicia, uma vez por processo, o servidor das métricas em uma thread,
+    se DASH_PORTA_METRICAS estiver configurada. Se a porta estiver ocupada
+    (ex.: outro processo do dashboard), avisa no terminal e segue sem ele.
+    """
+    global _servidor
+    if not PORTA_METRICAS or _servidor is not None:
+        return
+    with _trava_servidor:
+        if _servidor is not None:
+            return
+        try:
+            _servidor = ThreadingHTTPServer((ENDERECO_METRICAS, int(PORTA_METRICAS)), _Requisicao)
+        except OSError as e:
+            print(f"Métricas indisponíveis em {ENDERECO_METRICAS}:{PORTA_METRICAS}: {e}", file=sys.stderr)
+            _servidor = False
+            return
+        _servidor.daemon_threads = True
+        threading.Thread(target=_servidor.serve_forever, name="metricas", daemon=True).start()
@@ -0,0 +1,52 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import streamlit as st
+
+# Nomes dos meses em português
+NOMES_MESES = [
+    "Janeiro", "Fevereiro", "Março", "Abril", "Maio", "Junho",
+    "Julho", "Agosto", "Setembro", "Outubro", "Novembro", "Dezembro"
+]
+
+
+# -------------------------- NOMES DOS MESES --------------------------
+def nome_mes(mes):
+    """
+    Converte 'AAAA-MM' em 'Mês AAAA' (ex.: '2025-08' -> 'Agosto 2025').
+    """
+    ano, numero = mes.split('-')
+    return f"{NOMES_MESES[int(numero) - 1]} {ano}"
+
+
+def _mes_seguinte(mes):
+    ano, numero = map(int, mes.split('-'))
+    return f"{ano + numero // 12}-{numero % 12 + 1:02d}"
+
+
+def descrever_periodo(meses):
+    """
+    Descreve os meses selecionados para títulos: um mês ('Agosto 2025'), um
+    intervalo contínuo ('Agosto 2025 a Outubro 2025') ou uma lista.
+    """
+    meses = sorted(meses)
+    if not meses:
+        return "nenhum mês selecionado"
+    if len(meses) == 1:
+        return nome_mes(meses[0])
+    continuo = all(_mes_seguinte(a) == b for a, b in zip(meses, meses[1:]))
+    if continuo:
+        return f"{nome_mes(meses[0])} a {nome_mes(meses[-1])}"
+    return ", ".join(nome_mes(mes) for mes in meses[:-1]) + f" e {nome_mes(meses[-1])}"
+
+
+# -------------------------- SELETOR DE MESES --------------------------
+def seletor_meses(meses_disponiveis):
+    """
+    Exibe na barra lateral a seleção de meses e retorna os meses escolhidos
+    ('AAAA-MM', em ordem). Por padrão, seleciona o mês mais recente.
+    """
+    # As opções são os nomes dos meses, mapeados de volta para 'AAAA-MM'
+    opcoes = {nome_mes(mes): mes for mes in sorted(meses_disponiveis)}
+    nomes = list(opcoes)
+    st.sidebar.header("📅 Período")
+    selecionados = st.sidebar.multiselect("Meses", nomes, default=nomes[-1:])
+    return sorted(opcoes[nome] for nome in selecionados)
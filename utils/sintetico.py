@@ -0,0 +1,177 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import argparse
+import calendar
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.armazenamento import tipar_colunas
+from utils.exportacao import LINHAS_POR_ABA, gerar_excel
+
+# Planilha gerada por padrão: fora do diretório das planilhas reais, para
+# que o dashboard não some os dados sintéticos aos verdadeiros. Para abri-la
+# no dashboard, use DASH_DIRETORIO_DADOS=sintetico
+SAIDA_PADRAO = os.path.join("sintetico", "Analise_Sintetico.xlsx")
+
+# Linhas geradas de cada vez; cada bloco tem sua própria semente, então os
+# dados dependem só do número de linhas e da semente
+LINHAS_POR_BLOCO = 100_000
+
+# Tamanhos padrão dos datasets sintéticos
+TAMANHOS = {'10k': 10_000, '100k': 100_000, '1M': 1_000_000, '10M': 10_000_000}
+
+# Subáreas com a fração das linhas e o número de serviços de cada uma,
+# próximos aos da planilha de agosto
+SUBAREAS = {
+    'Especialidades Médicas': (0.527, 25),
+    'S.S.T': (0.279, 5),
+    'Odontologia': (0.145, 12),
+    'Central de Atendimento': (0.049, 1),
+}
+
+# Demais dimensões, com a fração das linhas de cada valor
+UNIDADES = {'SESI SAUDE': 0.84, 'UNIDADE LESTE': 0.16}
+CATEGORIAS = {'Ñ Industriário': 0.546, 'Indústria Ñ Sind.': 0.254, 'Industria Sindicalizada': 0.2}
+TIPOS_ATENDIMENTO = {'Particular': 0.635, 'Por Contrato': 0.365}
+TIPOS_SERVICO = {'Procedimento': 0.75, 'Atendimento': 0.245, 'Nenhum': 0.005}
+
+# Máximo de preços distintos de um serviço
+MAXIMO_PRECOS = 15
+
+
+# -------------------------- CATÁLOGO DE SERVIÇOS --------------------------
+def _sortear(rng, valores, tamanho):
+    return rng.choice(np.array(list(valores), dtype=object), size=tamanho, p=list(valores.values()))
+
+
+def catalogo_servicos(semente=0):
+    """
+    Retorna o catálogo de serviços sintéticos: código, nome, subárea, tipo
+    de serviço, peso (fração das linhas) e tabela de preços de cada um.
+    Os serviços mais populares de cada subárea concentram a maior parte das
+    linhas, e parte dos preços é zero (atendimentos cobertos por contrato).
+    """
+    rng = np.random.default_rng([semente, 0])
+    servicos = []
+    for subarea, (fracao, quantidade) in SUBAREAS.items():
+        popularidade = 1 / np.arange(1, quantidade + 1)
+        popularidade /= popularidade.sum()
+        for posicao in range(quantidade):
+            if subarea == 'Central de Atendimento':
+                tipo_servico = 'Atendimento'
+            else:
+                tipo_servico = _sortear(rng, TIPOS_SERVICO, 1)[0]
+            precos = np.round(rng.lognormal(mean=3.2, sigma=1.0, size=rng.integers(1, MAXIMO_PRECOS + 1)), 2)
+            precos[rng.random(len(precos)) < 0.25] = 0.0
+            servicos.append({
+                'CDServico': 101 + len(servicos),
+                'NMServico': f"Serviços de {subarea} {posicao + 1:02d}",
+                'Subarea': subarea,
+                'TipoServico': tipo_servico,
+                'peso': fracao * popularidade[posicao],
+                'precos': precos,
+            })
+    return servicos
+
+
+def _dias_do_mes(mes):
+    # Dias do mês com o peso de cada um: sem atendimento aos domingos e
+    # movimento menor aos sábados
+    ano, numero = map(int, mes.split('-'))
+    dias = pd.date_range(f"{mes}-01", periods=calendar.monthrange(ano, numero)[1], freq='D')
+    pesos = np.where(dias.dayofweek == 6, 0.0, np.where(dias.dayofweek == 5, 0.3, 1.0))
+    return dias.to_numpy(), pesos / pesos.sum()
+
+
+# -------------------------- GERAÇÃO DOS DADOS --------------------------
+def gerar_blocos(linhas, semente=0, meses=('2025-08',), linhas_por_bloco=LINHAS_POR_BLOCO):
+    """
+    Gera `linhas` atendimentos sintéticos com as colunas da planilha mensal,
+    distribuídos igualmente entre os `meses` ('AAAA-MM'), e devolve um
+    DataFrame já tipado (ver utils.armazenamento.tipar_colunas) a cada
+    `linhas_por_bloco` linhas. Com a mesma semente, os dados são sempre os
+    mesmos.
+    """
+    servicos = catalogo_servicos(semente)
+    pesos = np.array([servico['peso'] for servico in servicos])
+    codigos = np.array([servico['CDServico'] for servico in servicos])
+    nomes = np.array([servico['NMServico'] for servico in servicos], dtype=object)
+    subareas = np.array([servico['Subarea'] for servico in servicos], dtype=object)
+    tipos_servico = np.array([servico['TipoServico'] for servico in servicos], dtype=object)
+    quantidade_precos = np.array([len(servico['precos']) for servico in servicos])
+    precos = np.zeros((len(servicos), MAXIMO_PRECOS))
+    for posicao, servico in enumerate(servicos):
+        precos[posicao, :len(servico['precos'])] = servico['precos']
+    calendario = [_dias_do_mes(mes) for mes in meses]
+
+    for numero, inicio in enumerate(range(0, linhas, linhas_por_bloco), start=1):
+        tamanho = min(linhas_por_bloco, linhas - inicio)
+        rng = np.random.default_rng([semente, numero])
+        servico = rng.choice(len(servicos), size=tamanho, p=pesos)
+        preco = (rng.random(tamanho) * quantidade_precos[servico]).astype(np.int64)
+
+        datas = np.empty(tamanho, dtype='datetime64[ns]')
+        mes = rng.integers(len(meses), size=tamanho)
+        for posicao, (dias, pesos_dias) in enumerate(calendario):
+            linhas_mes = mes == posicao
+            datas[linhas_mes] = rng.choice(dias, size=int(linhas_mes.sum()), p=pesos_dias)
+
+        yield tipar_colunas(pd.DataFrame({
+            'Unidade': _sortear(rng, UNIDADES, tamanho),
+            'dataRealizado': datas,
+            'Categoria': _sortear(rng, CATEGORIAS, tamanho),
+            'CDServico': codigos[servico],
+            'NMServico': nomes[servico],
+            'Subarea': subareas[servico],
+            'Quantidade': np.ones(tamanho, dtype=np.int64),
+            'ValorUnitario': precos[servico, preco],
+            'TipoAtendimento': _sortear(rng, TIPOS_ATENDIMENTO, tamanho),
+            'TipoServico': tipos_servico[servico],
+        }))
+
+
+def gerar_dados(linhas, semente=0, meses=('2025-08',)):
+    """
+    Retorna os `linhas` atendimentos sintéticos em um único DataFrame (ver
+    gerar_blocos).
+    """
+    return pd.concat(list(gerar_blocos(linhas, semente, meses)), ignore_index=True)
+
+
+def identificador(linhas, semente=0, meses=('2025-08',)):
+    """
+    Identifica um dataset sintético; usado no lugar do hash da planilha ao
+    gravá-lo no armazenamento colunar.
+    """
+    return f"sintetico-{linhas}-{semente}-{'_'.join(meses)}"
+
+
+# -------------------------- LINHA DE COMANDO --------------------------
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Gera uma planilha sintética com as colunas da planilha mensal."
+    )
+    parser.add_argument("linhas", help=f"número de linhas ou um dos tamanhos {', '.join(TAMANHOS)}")
+    parser.add_argument("-o", "--saida", default=SAIDA_PADRAO, help=f"planilha gerada (padrão: {SAIDA_PADRAO})")
+    parser.add_argument("-s", "--semente", type=int, default=0, help="semente dos dados")
+    parser.add_argument("-m", "--meses", nargs="+", default=['2025-08'], help="meses (AAAA-MM)")
+    args = parser.parse_args(argumentos)
+
+    linhas = TAMANHOS.get(args.linhas) or int(args.linhas)
+    if linhas > LINHAS_POR_ABA:
+        print(f"Uma planilha comporta no máximo {LINHAS_POR_ABA} linhas; "
+              "use utils.benchmark para datasets maiores.", file=sys.stderr)
+        return 1
+
+    df = gerar_dados(linhas, args.semente, args.meses)
+    os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+    with open(args.saida, "wb") as arquivo:
+        arquivo.write(gerar_excel({'Dados': df}))
+    print(f"{args.saida}: {linhas} linhas ({', '.join(args.meses)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
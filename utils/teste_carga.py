@@ -0,0 +1,367 @@
+# -------------------------- IMPORTAÇÃO DE BIBLIOTECAS --------------------------
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+from utils.benchmark import RAIZ_REPOSITORIO, commit_atual
+from utils.metricas import memoria_residente
+
+# Índice da barra lateral no caminho dos elementos (delta_path)
+CONTAINER_BARRA_LATERAL = 1
+
+# Percentis de latência exibidos
+PERCENTIS = (50, 90, 95, 99)
+
+# Tempo máximo de uma execução da página, em segundos
+TEMPO_MAXIMO_EXECUCAO = 300
+
+
+# -------------------------- SESSÃO DO NAVEGADOR --------------------------
+class Sessao:
+    """
+    Uma sessão do dashboard conectada ao servidor pelo mesmo websocket que o
+    navegador usa: pede execuções da página com o estado dos widgets e lê as
+    mensagens até o fim da execução.
+
+    self.pagina é o hash da página atual, enviado em todas as execuções (sem
+    ele, o servidor executa a página principal); self.executada é o nome da
+    página que o servidor informou ter executado por último.
+    """
+
+    def __init__(self, endereco):
+        self.endereco = endereco
+        self.paginas = {}
+        self.pagina = None
+        self.executada = None
+        self.selectboxes = {}
+        self._conexao = None
+        self._mensagens = {}
+
+    async def conectar(self):
+        url = self.endereco.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        self._conexao = await websocket_connect(url)
+
+    def fechar(self):
+        if self._conexao is not None:
+            self._conexao.close()
+
+    async def executar(self, pagina=None, estados=None):
+        """
+        Executa a página (hash de self.paginas; None repete a atual) com os
+        valores dos selectboxes em `estados` ({id: índice da opção}). Retorna
+        (segundos até o fim da execução, número de exceções exibidas).
+        """
+        mensagem = BackMsg()
+        estado = mensagem.rerun_script
+        estado.query_string = ""
+        if pagina is not None:
+            self.pagina = pagina
+        if self.pagina is not None:
+            estado.page_script_hash = self.pagina
+        for identificador, indice in (estados or {}).items():
+            widget = estado.widget_states.widgets.add()
+            widget.id = identificador
+            widget.int_value = indice
+
+        inicio = time.perf_counter()
+        await self._conexao.write_message(mensagem.SerializeToString(), binary=True)
+        excecoes = await asyncio.wait_for(self._ler_execucao(), TEMPO_MAXIMO_EXECUCAO)
+        return time.perf_counter() - inicio, excecoes
+
+    async def _ler_execucao(self):
+        self.selectboxes = {}
+        excecoes = 0
+        while True:
+            dados = await self._conexao.read_message()
+            if dados is None:
+                raise ConnectionError("o servidor fechou a conexão")
+            mensagem = ForwardMsg()
+            mensagem.ParseFromString(dados)
+            tipo = mensagem.WhichOneof("type")
+
+            # Mensagens grandes já enviadas nesta sessão chegam só como referência
+            if tipo == "ref_hash":
+                caminho = list(mensagem.metadata.delta_path)
+                mensagem = self._mensagens[mensagem.ref_hash]
+                tipo = mensagem.WhichOneof("type")
+            else:
+                caminho = list(mensagem.metadata.delta_path)
+                if mensagem.metadata.cacheable:
+                    self._mensagens[mensagem.hash] = mensagem
+
+            # O servidor envia new_session no início de cada execução, com o
+            # hash da página que está executando
+            if tipo == "new_session":
+                self.paginas = {pagina.page_name: pagina.page_script_hash for pagina in mensagem.new_session.app_pages}
+                self.pagina = mensagem.new_session.page_script_hash
+                self.executada = next(
+                    (nome for nome, hash_pagina in self.paginas.items() if hash_pagina == self.pagina), None
+                )
+            elif tipo == "delta" and mensagem.delta.WhichOneof("type") == "new_element":
+                elemento = mensagem.delta.new_element
+                tipo_elemento = elemento.WhichOneof("type")
+                if tipo_elemento == "exception":
+                    excecoes += 1
+                elif tipo_elemento == "selectbox" and caminho[:1] == [CONTAINER_BARRA_LATERAL]:
+                    self.selectboxes[elemento.selectbox.id] = len(elemento.selectbox.options)
+            elif tipo == "script_finished":
+                return excecoes
+
+
+# -------------------------- SIMULAÇÃO --------------------------
+async def simular_sessao(endereco, pagina, interacoes, pausa, rng, latencias):
+    """
+    Abre a `pagina` em uma nova sessão e faz `interacoes` trocas aleatórias
+    de um selectbox da barra lateral, esperando até `pausa` segundos entre
+    elas. Cada execução entra em `latencias` como (página, tipo, segundos,
+    exceções, página executada pelo servidor), com tipo 'carga' para a
+    abertura e 'interacao' para as trocas.
+    """
+    sessao = Sessao(endereco)
+    await sessao.conectar()
+    try:
+        segundos, excecoes = await sessao.executar()
+        if pagina not in sessao.paginas:
+            raise ValueError(f"página desconhecida: {pagina} (disponíveis: {', '.join(sessao.paginas)})")
+        if pagina != next(iter(sessao.paginas)):
+            segundos, excecoes = await sessao.executar(sessao.paginas[pagina])
+        latencias.append((pagina, 'carga', segundos, excecoes, sessao.executada))
+
+        estados = {}
+        for _ in range(interacoes):
+            await asyncio.sleep(rng.uniform(0, pausa))
+            if not sessao.selectboxes:
+                break
+            identificador = rng.choice(sorted(sessao.selectboxes))
+            estados[identificador] = rng.randrange(sessao.selectboxes[identificador])
+            segundos, excecoes = await sessao.executar(estados=estados)
+            latencias.append((pagina, 'interacao', segundos, excecoes, sessao.executada))
+    finally:
+        sessao.fechar()
+
+
+async def simular(endereco, paginas, sessoes, interacoes, pausa, semente):
+    """
+    Executa `sessoes` sessões ao mesmo tempo, distribuídas entre as
+    `paginas` em rodízio. Retorna (latências, segundos de simulação).
+    """
+    latencias = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*[
+        simular_sessao(endereco, paginas[numero % len(paginas)], interacoes, pausa,
+                       random.Random(semente + numero), latencias)
+        for numero in range(sessoes)
+    ])
+    return latencias, time.perf_counter() - inicio
+
+
+# -------------------------- SERVIDOR E MEMÓRIA --------------------------
+def iniciar_servidor(porta, script="Home.py"):
+    """
+    Inicia `streamlit run` do dashboard em modo headless na `porta` e espera
+    o servidor responder. Retorna o processo.
+    """
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script,
+         "--server.headless", "true", "--server.port", str(porta),
+         "--browser.gatherUsageStats", "false"],
+        cwd=RAIZ_REPOSITORIO, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    limite = time.monotonic() + 60
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError("o servidor do Streamlit terminou ao iniciar")
+        try:
+            with urllib.request.urlopen(f"http://localhost:{porta}/_stcore/health", timeout=1):
+                return processo
+        except OSError:
+            time.sleep(0.5)
+    processo.terminate()
+    raise TimeoutError("o servidor do Streamlit não respondeu em 60 s")
+
+
+class MonitorMemoria(threading.Thread):
+    """
+    Amostra a memória residente do processo `pid` a cada `intervalo`
+    segundos e guarda o maior valor em self.pico.
+    """
+
+    def __init__(self, pid, intervalo=0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.intervalo = intervalo
+        self.pico = memoria_residente(pid)
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            atual = memoria_residente(self.pid)
+            if atual is not None and (self.pico is None or atual > self.pico):
+                self.pico = atual
+
+    def parar(self):
+        self._parar.set()
+        self.join()
+
+
+# -------------------------- RELATÓRIO --------------------------
+def resumir(latencias, segundos):
+    """
+    Resume as latências das interações (em ms): percentis, máximo e vazão
+    (execuções por segundo), no geral e por página. As aberturas de página
+    entram em 'carga'. Confere também, por página, as execuções pretendidas
+    com as que o servidor informou ter executado; as diferenças entram em
+    'divergencias'.
+    """
+    def estatisticas(valores):
+        valores = np.array(valores) * 1000
+        resumo = {f"p{percentil}": float(np.percentile(valores, percentil)) for percentil in PERCENTIS}
+        resumo['maximo'] = float(valores.max())
+        resumo['execucoes'] = len(valores)
+        return resumo
+
+    interacoes = [item for item in latencias if item[1] == 'interacao']
+    cargas = [item for item in latencias if item[1] == 'carga']
+    resumo = {
+        'duracao': segundos,
+        'vazao': len(latencias) / segundos if segundos else 0.0,
+        'excecoes': sum(item[3] for item in latencias),
+        'geral': estatisticas([item[2] for item in interacoes]) if interacoes else None,
+        'carga': estatisticas([item[2] for item in cargas]) if cargas else None,
+        'paginas': {},
+    }
+    for pagina in dict.fromkeys(item[0] for item in interacoes):
+        resumo['paginas'][pagina] = estatisticas([item[2] for item in interacoes if item[0] == pagina])
+
+    contagem = {}
+    for item in latencias:
+        contagem.setdefault(item[0], {'pretendidas': 0, 'executadas': 0})['pretendidas'] += 1
+        contagem.setdefault(str(item[4]), {'pretendidas': 0, 'executadas': 0})['executadas'] += 1
+    resumo['execucoes_por_pagina'] = contagem
+    resumo['divergencias'] = sum(1 for item in latencias if item[4] != item[0])
+    return resumo
+
+
+def _exibir_linha(nome, estatisticas):
+    percentis = "  ".join(f"p{percentil} {estatisticas[f'p{percentil}']:8.1f}" for percentil in PERCENTIS)
+    print(f"  {nome:<26} {percentis}  máx {estatisticas['maximo']:8.1f} ms  ({estatisticas['execucoes']} execuções)")
+
+
+def exibir_resumo(resumo):
+    print(f"Duração: {resumo['duracao']:.1f} s; vazão: {resumo['vazao']:.1f} execuções/s; "
+          f"exceções: {resumo['excecoes']}")
+    if resumo['carga']:
+        _exibir_linha("(abertura das páginas)", resumo['carga'])
+    if resumo['geral']:
+        _exibir_linha("(interações, geral)", resumo['geral'])
+    for pagina, estatisticas in resumo['paginas'].items():
+        _exibir_linha(pagina, estatisticas)
+    if resumo['divergencias']:
+        print(f"{resumo['divergencias']} execuções rodaram outra página no servidor:")
+        for pagina, contagem in resumo['execucoes_por_pagina'].items():
+            print(f"  {pagina:<26} pretendidas {contagem['pretendidas']:5d}  executadas {contagem['executadas']:5d}")
+    for chave, rotulo in (('rss_inicial', "inicial"), ('rss_pico', "pico")):
+        if resumo.get(chave) is not None:
+            print(f"Memória residente do servidor ({rotulo}): {resumo[chave] / 1024 ** 2:.0f} MB")
+
+
+# -------------------------- LINHA DE COMANDO --------------------------
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Simula sessões simultâneas nos dashboards e mede a latência das execuções."
+    )
+    parser.add_argument("-n", "--sessoes", type=int, default=10, help="sessões simultâneas")
+    parser.add_argument("-i", "--interacoes", type=int, default=20, help="trocas de filtro por sessão")
+    parser.add_argument("--pausa", type=float, default=1.0,
+                        help="pausa máxima entre interações de uma sessão, em segundos")
+    parser.add_argument("-p", "--paginas", nargs="+",
+                        help="páginas simuladas, pelo nome (padrão: todas)")
+    parser.add_argument("-s", "--semente", type=int, default=0, help="semente das escolhas aleatórias")
+    parser.add_argument("--porta", type=int, default=8599, help="porta do servidor iniciado para o teste")
+    parser.add_argument("--endereco",
+                        help="usa um servidor já em execução (ex.: http://localhost:8501) em vez de iniciar um")
+    parser.add_argument("--pid", type=int, help="processo do servidor informado em --endereco, para medir a memória")
+    parser.add_argument("--sem-aquecimento", action="store_true",
+                        help="não abre cada página uma vez antes de medir")
+    parser.add_argument("-o", "--saida", help="arquivo JSON com os resultados")
+    args = parser.parse_args(argumentos)
+
+    processo = None
+    if args.endereco:
+        endereco, pid = args.endereco, args.pid
+    else:
+        print(f"Iniciando o servidor na porta {args.porta}...", flush=True)
+        processo = iniciar_servidor(args.porta)
+        endereco, pid = f"http://localhost:{args.porta}", processo.pid
+
+    try:
+        # Descobre as páginas e, no aquecimento, abre cada uma uma vez, para
+        # que a conversão das planilhas e os caches não entrem na medição
+        descoberta = Sessao(endereco)
+
+        async def descobrir():
+            await descoberta.conectar()
+            try:
+                await descoberta.executar()
+                if not args.sem_aquecimento:
+                    for pagina, hash_pagina in descoberta.paginas.items():
+                        segundos, _ = await descoberta.executar(hash_pagina)
+                        print(f"  aquecimento {pagina:<26} {segundos * 1000:10.1f} ms", flush=True)
+            finally:
+                descoberta.fechar()
+
+        asyncio.run(descobrir())
+        paginas = args.paginas or list(descoberta.paginas)
+
+        monitor = MonitorMemoria(pid) if pid is not None else None
+        rss_inicial = monitor.pico if monitor is not None else None
+        if monitor is not None:
+            monitor.start()
+        print(f"Simulando {args.sessoes} sessões em {', '.join(paginas)}...", flush=True)
+        try:
+            latencias, segundos = asyncio.run(
+                simular(endereco, paginas, args.sessoes, args.interacoes, args.pausa, args.semente)
+            )
+        finally:
+            if monitor is not None:
+                monitor.parar()
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    resumo = resumir(latencias, segundos)
+    resumo['rss_inicial'] = rss_inicial
+    resumo['rss_pico'] = monitor.pico if monitor is not None else None
+    exibir_resumo(resumo)
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as arquivo:
+            json.dump({
+                'commit': commit_atual(),
+                'data': datetime.now().isoformat(timespec='seconds'),
+                'sessoes': args.sessoes,
+                'interacoes': args.interacoes,
+                'pausa': args.pausa,
+                'semente': args.semente,
+                'paginas': paginas,
+                'resumo': resumo,
+            }, arquivo, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.saida}")
+    return 1 if resumo['excecoes'] or resumo['divergencias'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())